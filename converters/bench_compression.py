@@ -0,0 +1,72 @@
+"""
+Reports bytes-on-wire / history bytes for the repo's sample workflow payloads with and without CompressionCodec.
+
+Every workflow input, activity input and result is encoded once as it would be for history; the totals are
+what the server stores and what crosses the wire between client, server and workers.
+
+    python -m converters.bench_compression
+"""
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from converters.compression import CompressionCodec
+from converters.data_converter import PayloadConverterSet
+
+
+def sample_payloads() -> dict:
+    """Workflow and activity arguments/results shaped like the sample workflows in this repo."""
+    rng = np.random.default_rng(0)
+    orders = pd.DataFrame({
+        "id": np.arange(50_000),
+        "user_id": rng.integers(1, 500, size=50_000),
+        "total_price": np.round(rng.random(50_000) * 500, 2),
+    })
+    return {
+        "static: StaticWorkflow input/result": ["Hello, Temporal!", "Processed Hello, Temporal!"],
+        "dynamic: task list + results": [
+            ["easm_reporting_task", "monte_carlo_task"],
+            "Workflow completed with results: ['Executed EASM Reporting for easm_reporting_task', "
+            "'Executed MonteCarlo for monte_carlo_task']",
+        ],
+        "parent_child: MainWorkflow message": [{
+            "run_child": True,
+            "child_payload": {"child_key": "child_value"},
+            "tasks": ["task_a", "task_b", "task_c"] * 50,
+        }],
+        "object: 10k-item data_list + results": [
+            [f"task{i}" for i in range(10_000)],
+            [f"Worker1: Processed task{i}" for i in range(10_000)],
+        ],
+        "tasks: DynamicWorkflow result summary": [{
+            "workflow_id": "dynamic-workflow-0",
+            "run_id": "run-0",
+            "task_results": [{"task_name": f"Task{i}", "result": f"Task{i} Completed"} for i in range(2_000)],
+        }],
+        "tasks: ProcessAndWriteTask DataFrame map": [{"orders": orders}],
+    }
+
+
+async def measure():
+    converter = PayloadConverterSet()
+    codec = CompressionCodec()
+
+    print(f"{'sample':<42}{'raw bytes':>14}{'zstd bytes':>14}{'saved':>8}")
+    total_raw = total_encoded = 0
+    for name, values in sample_payloads().items():
+        payloads = converter.to_payloads(values)
+        encoded = await codec.encode(payloads)
+        assert await codec.decode(encoded) == payloads  # Round-trips, and uncompressed payloads pass through
+
+        raw = sum(p.ByteSize() for p in payloads)
+        compressed = sum(p.ByteSize() for p in encoded)
+        total_raw += raw
+        total_encoded += compressed
+        print(f"{name:<42}{raw:>14,}{compressed:>14,}{1 - compressed / raw:>8.0%}")
+
+    print(f"{'total':<42}{total_raw:>14,}{total_encoded:>14,}{1 - total_encoded / total_raw:>8.0%}")
+
+
+if __name__ == '__main__':
+    asyncio.run(measure())
@@ -0,0 +1,289 @@
+"""
+Claim checks: activity results and heartbeat details above a size threshold go to a blob store, and only a
+small `ClaimCheck` reference goes into workflow history.
+
+Only payloads encoded inside an activity are offloaded: that is the one place the codec knows which
+workflow a payload belongs to, so every blob is stored under that workflow's key prefix and
+`release_workflow_claim_checks` removes all of them when the workflow closes. Workflow inputs, commands and
+results stay inline (compressed).
+
+The codec is attached only to workers that handle references (see run_task_worker): their workflows pass
+`ClaimCheck`s along without fetching them, and `ClaimCheckInterceptor` dereferences activity arguments
+before the activity runs.
+"""
+import asyncio
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Type
+
+import boto3
+from temporalio import activity
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import EncodingPayloadConverter, PayloadCodec
+from temporalio.worker import ActivityInboundInterceptor, ExecuteActivityInput, Interceptor
+
+CLAIM_CHECK_ENCODING = "claim-check/ref"
+DEFAULT_THRESHOLD_BYTES = 128 * 1024
+
+
+class BlobStore(ABC):
+    """Abstract blob store holding offloaded payloads."""
+
+    @abstractmethod
+    def put(self, key: str, data: bytes):
+        pass
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str):
+        """Deletes every blob whose key starts with `prefix/`."""
+
+
+class LocalBlobStore(BlobStore):
+    """Stores blobs as files under a local directory (single host / local testing)."""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)  # Readers never see a partial blob
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete_prefix(self, prefix: str):
+        shutil.rmtree(self._path(prefix), ignore_errors=True)
+
+
+class S3BlobStore(BlobStore):
+    """Stores blobs as objects under an S3 prefix."""
+
+    def __init__(self, bucket: str, prefix: str = "claim-checks/", s3_client=None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.s3_client = s3_client or boto3.client("s3")
+
+    def put(self, key: str, data: bytes):
+        self.s3_client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+
+    def get(self, key: str) -> bytes:
+        return self.s3_client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"].read()
+
+    def delete(self, key: str):
+        self.s3_client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def delete_prefix(self, prefix: str):
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=f"{self.prefix}{prefix}/"):
+            keys = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+            if keys:  # A page holds at most 1000 keys, the delete_objects limit
+                self.s3_client.delete_objects(Bucket=self.bucket, Delete={"Objects": keys, "Quiet": True})
+
+
+def blob_store_from_env() -> BlobStore:
+    """Builds the blob store from CLAIM_CHECK_STORE (local|s3), CLAIM_CHECK_PATH and CLAIM_CHECK_BUCKET."""
+    if os.getenv("CLAIM_CHECK_STORE", "local").lower() == "s3":
+        return S3BlobStore(os.environ["CLAIM_CHECK_BUCKET"], os.getenv("CLAIM_CHECK_PREFIX", "claim-checks/"))
+    return LocalBlobStore(os.getenv("CLAIM_CHECK_PATH", "/tmp/temporal-claim-checks"))
+
+
+# Process-wide store used to dereference and release claim checks; workers set it at startup (the same
+# store they pass to connect_client)
+_blob_store: Optional[BlobStore] = None
+
+
+def set_blob_store(store: BlobStore):
+    global _blob_store
+    _blob_store = store
+
+
+def get_blob_store() -> BlobStore:
+    if _blob_store is None:
+        raise RuntimeError("No claim-check blob store configured in this process (see set_blob_store)")
+    return _blob_store
+
+
+def workflow_key_prefix(workflow_id: str) -> str:
+    """Key prefix of every blob offloaded for `workflow_id` (hashed: workflow ids may contain any character)."""
+    return hashlib.sha256(workflow_id.encode()).hexdigest()[:24]
+
+
+def _activity_workflow_id() -> Optional[str]:
+    try:
+        return activity.info().workflow_id
+    except RuntimeError:
+        return None  # Not encoding inside an activity (client, workflow commands)
+
+
+@dataclass(frozen=True)
+class ClaimCheck:
+    """Reference to a payload that was offloaded to the blob store. Only this goes into workflow history."""
+    key: str
+    size: int
+
+
+class ClaimCheckPayloadConverter(EncodingPayloadConverter):
+    """Keeps claim-check references as `ClaimCheck` objects so workflows pass them along without fetching."""
+
+    @property
+    def encoding(self) -> str:
+        return CLAIM_CHECK_ENCODING
+
+    def to_payload(self, value: Any) -> Optional[Payload]:
+        if not isinstance(value, ClaimCheck):
+            return None
+        return Payload(
+            metadata={"encoding": CLAIM_CHECK_ENCODING.encode()},
+            data=json.dumps({"key": value.key, "size": value.size}).encode(),
+        )
+
+    def from_payload(self, payload: Payload, type_hint: Optional[Type] = None) -> Any:
+        ref = json.loads(payload.data)
+        return ClaimCheck(key=ref["key"], size=ref["size"])
+
+
+class ClaimCheckCodec(PayloadCodec):
+    """
+    Moves activity results and heartbeat details above `threshold_bytes` into the blob store, under their
+    workflow's key prefix, and leaves a small reference in their place.
+    """
+
+    def __init__(self, store: BlobStore, threshold_bytes: int = DEFAULT_THRESHOLD_BYTES):
+        self.store = store
+        self.threshold_bytes = threshold_bytes
+
+    async def encode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        workflow_id = _activity_workflow_id()
+        encoded = []
+        for payload in payloads:
+            size = payload.ByteSize()
+            if (workflow_id is None or size < self.threshold_bytes
+                    or payload.metadata.get("encoding") == CLAIM_CHECK_ENCODING.encode()):
+                encoded.append(payload)
+                continue
+            key = f"{workflow_key_prefix(workflow_id)}/{uuid.uuid4()}"
+            await asyncio.to_thread(self.store.put, key, payload.SerializeToString())
+            encoded.append(ClaimCheckPayloadConverter().to_payload(ClaimCheck(key=key, size=size)))
+        return encoded
+
+    async def decode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        # References are left in place and dereferenced lazily by `resolve()` where the data is needed
+        return list(payloads)
+
+
+def resolve(value: Any, type_hint: Optional[Type] = None) -> Any:
+    """Returns the original value behind a `ClaimCheck`, or `value` unchanged if it is not one."""
+    if not isinstance(value, ClaimCheck):
+        return value
+
+    payload = Payload.FromString(get_blob_store().get(value.key))
+    try:
+        converter = activity.payload_converter()  # The worker's converter (e.g. DataFrame-aware)
+    except RuntimeError:
+        from converters.data_converter import PayloadConverterSet  # Not running inside an activity
+        converter = PayloadConverterSet()
+    return converter.from_payload(payload, type_hint)
+
+
+def offload(value: Any, threshold_bytes: int = DEFAULT_THRESHOLD_BYTES) -> Any:
+    """
+    Inside an activity: stores `value` and returns its `ClaimCheck` when it serializes to `threshold_bytes`
+    or more, else returns `value`. For parts of a result the workflow unpacks, which the codec would
+    otherwise offload as a whole.
+    """
+    payload = activity.payload_converter().to_payload(value)
+    size = payload.ByteSize()
+    if size < threshold_bytes:
+        return value
+    key = f"{workflow_key_prefix(activity.info().workflow_id)}/{uuid.uuid4()}"
+    get_blob_store().put(key, payload.SerializeToString())
+    return ClaimCheck(key=key, size=size)
+
+
+def resolve_all(value: Any) -> Any:
+    """`resolve()` applied to every `ClaimCheck` nested in lists, tuples and dict values."""
+    if isinstance(value, ClaimCheck):
+        return resolve(value)
+    if isinstance(value, dict):
+        return {key: resolve_all(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(resolve_all(item) for item in value)
+    return value
+
+
+def keeps_claim_checks(fn):
+    """Marks an activity that takes claim-check references as such, so `ClaimCheckInterceptor` leaves them."""
+    fn.__keeps_claim_checks__ = True
+    return fn
+
+
+class _ResolveArguments(ActivityInboundInterceptor):
+    async def execute_activity(self, input: ExecuteActivityInput) -> Any:
+        if not getattr(input.fn, "__keeps_claim_checks__", False) and collect_claim_checks(list(input.args)):
+            args = await asyncio.to_thread(resolve_all, list(input.args))  # Blob reads block
+            input = dataclasses.replace(input, args=args)
+        return await super().execute_activity(input)
+
+
+class ClaimCheckInterceptor(Interceptor):
+    """Worker interceptor that dereferences `ClaimCheck` arguments before every activity runs."""
+
+    def intercept_activity(self, next: ActivityInboundInterceptor) -> ActivityInboundInterceptor:
+        return _ResolveArguments(next)
+
+
+def collect_claim_checks(value: Any) -> List[ClaimCheck]:
+    """Finds every `ClaimCheck` nested in lists, tuples and dict values (e.g. a workflow's results)."""
+    if isinstance(value, ClaimCheck):
+        return [value]
+    if isinstance(value, dict):
+        return [ref for item in value.values() for ref in collect_claim_checks(item)]
+    if isinstance(value, (list, tuple)):
+        return [ref for item in value for ref in collect_claim_checks(item)]
+    return []
+
+
+@keeps_claim_checks
+@activity.defn(name="release_claim_checks")
+async def release_claim_checks(refs: list) -> int:
+    """Deletes offloaded blobs once the workflow that owns them is closing."""
+    store = get_blob_store()
+    keys = [ref.key if isinstance(ref, ClaimCheck) else ref for ref in refs]
+    for key in keys:
+        await asyncio.to_thread(store.delete, key)
+    return len(keys)
+
+
+@activity.defn(name="release_workflow_claim_checks")
+async def release_workflow_claim_checks(workflow_id: str):
+    """Deletes every blob offloaded for `workflow_id`, in any of its runs, once the workflow is closing."""
+    await asyncio.to_thread(get_blob_store().delete_prefix, workflow_key_prefix(workflow_id))
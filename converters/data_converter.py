@@ -0,0 +1,30 @@
+from temporalio.converter import CompositePayloadConverter, DataConverter, DefaultPayloadConverter
+
+from converters.claim_check import DEFAULT_THRESHOLD_BYTES, BlobStore, ClaimCheckCodec, ClaimCheckPayloadConverter
+from converters.compression import DEFAULT_MIN_BYTES, CodecChain, CompressionCodec
+from converters.dataframe import DataFramePayloadConverter
+
+
+class PayloadConverterSet(CompositePayloadConverter):
+    """Repo-wide payload converters: claim-check references and DataFrames first, then Temporal's defaults."""
+
+    def __init__(self):
+        super().__init__(
+            ClaimCheckPayloadConverter(),
+            DataFramePayloadConverter(),
+            *DefaultPayloadConverter.default_encoding_payload_converters,
+        )
+
+
+def build_data_converter(store: BlobStore = None, threshold_bytes: int = DEFAULT_THRESHOLD_BYTES,
+                         compress_min_bytes: int = DEFAULT_MIN_BYTES) -> DataConverter:
+    """
+    DataConverter shared by every client and worker. Claim checks are only enabled with a blob `store`, for
+    workers whose workflows and activities handle `ClaimCheck` references (see converters.claim_check).
+    """
+    codecs = [ClaimCheckCodec(store, threshold_bytes)] if store is not None else []
+    return DataConverter(
+        payload_converter_class=PayloadConverterSet,
+        # Offload decisions see the uncompressed size; whatever stays inline is then compressed
+        payload_codec=CodecChain(*codecs, CompressionCodec(compress_min_bytes)),
+    )
@@ -0,0 +1,165 @@
+"""
+Small, mergeable summaries of a sample: exact moments (Welford/Chan) plus a t-digest for quantiles.
+
+Shards build them from their own samples and only the summaries travel: merging two accumulators gives
+the same moments as one accumulator over both samples, and a digest whose quantiles are accurate to a
+fraction of a percentile (best in the tails, where VaR/ES live).
+"""
+import numpy as np
+
+DEFAULT_COMPRESSION = 500
+
+
+class MomentAccumulator:
+    """Count, mean, M2 (sum of squared deviations), min and max; merged with Chan's parallel formula."""
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0, minimum: float = float("inf"),
+                 maximum: float = float("-inf")):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = minimum
+        self.max = maximum
+
+    def add_array(self, values: np.ndarray):
+        if values.size == 0:
+            return
+        batch_mean = float(values.mean())
+        batch = MomentAccumulator(int(values.size), batch_mean, float(np.square(values - batch_mean).sum()),
+                                  float(values.min()), float(values.max()))
+        self.merge(batch)
+
+    def merge(self, other: "MomentAccumulator"):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.min, self.max = other.count, other.mean, other.m2, other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MomentAccumulator":
+        return cls(data["count"], data["mean"], data["m2"], data["min"], data["max"])
+
+
+class TDigest:
+    """
+    Merging t-digest (Dunning) with the arcsine scale function: centroids stay tiny near q=0 and q=1 and
+    grow towards the median, so tail quantiles keep their accuracy after any number of merges.
+
+    Compression merges neighbouring centroids whose midpoints fall in the same unit interval of k, done
+    with NumPy over the sorted centroid arrays (about compression / 2 centroids remain).
+    """
+
+    def __init__(self, compression: float = DEFAULT_COMPRESSION, means=None, weights=None):
+        self.compression = compression
+        self.means = np.asarray(means if means is not None else [], dtype=float)
+        self.weights = np.asarray(weights if weights is not None else [], dtype=float)
+
+    @property
+    def total_weight(self) -> float:
+        return float(self.weights.sum())
+
+    def _k(self, q: np.ndarray) -> np.ndarray:
+        return self.compression / (2 * np.pi) * np.arcsin(2 * np.clip(q, 0.0, 1.0) - 1)
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        if total == 0:
+            self.means, self.weights = means, weights
+            return
+        # Bucket every centroid by the integer k of its midpoint; a bucket spans at most one unit of k
+        midpoints = (np.cumsum(weights) - weights / 2) / total
+        buckets = np.floor(self._k(midpoints) - self._k(np.zeros(1))[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def add_array(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float).ravel()
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(values.size)]))
+
+    def merge(self, other: "TDigest"):
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+
+    def quantile(self, q, minimum: float, maximum: float):
+        """Interpolates between centroid midpoints, pinned to the exact sample min and max at the ends."""
+        cumulative = np.cumsum(self.weights) - self.weights / 2
+        positions = np.r_[0.0, cumulative, self.total_weight]
+        values = np.r_[minimum, self.means, maximum]
+        return np.interp(np.asarray(q) * self.total_weight, positions, values)
+
+    def lower_tail_mean(self, q: float, minimum: float, maximum: float, points: int = 512) -> float:
+        """Mean of the sample below its q-quantile (integrates the quantile function over [0, q])."""
+        grid = (np.arange(points) + 0.5) / points * q
+        return float(self.quantile(grid, minimum, maximum).mean())
+
+    def to_dict(self) -> dict:
+        return {"compression": self.compression, "means": self.means.tolist(), "weights": self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TDigest":
+        return cls(data["compression"], data["means"], data["weights"])
+
+
+class SimulationAccumulator:
+    """Everything a Monte Carlo shard reports: P&L moments, P&L digest and barrier hits."""
+
+    def __init__(self, moments: MomentAccumulator = None, digest: TDigest = None, barrier_hits: int = 0):
+        self.moments = moments or MomentAccumulator()
+        self.digest = digest or TDigest()
+        self.barrier_hits = barrier_hits
+
+    def add_chunk(self, pnl: np.ndarray, barrier_hits: int):
+        self.moments.add_array(pnl)
+        self.digest.add_array(pnl)
+        self.barrier_hits += barrier_hits
+
+    def merge(self, other: "SimulationAccumulator"):
+        self.moments.merge(other.moments)
+        self.digest.merge(other.digest)
+        self.barrier_hits += other.barrier_hits
+
+    def to_dict(self) -> dict:
+        return {"moments": self.moments.to_dict(), "digest": self.digest.to_dict(), "barrier_hits": self.barrier_hits}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SimulationAccumulator":
+        return cls(MomentAccumulator.from_dict(data["moments"]), TDigest.from_dict(data["digest"]),
+                   data["barrier_hits"])
+
+    def summary(self, quantiles, seed: int) -> dict:
+        """Same fields as `engine.summarize`, from the accumulator alone."""
+        m = self.moments
+        pnl_quantiles = self.digest.quantile(list(quantiles), m.min, m.max)
+        q05, q01 = self.digest.quantile([0.05, 0.01], m.min, m.max)
+        return {
+            "paths": m.count,
+            "mean_pnl": m.mean,
+            "std_pnl": float(np.sqrt(m.variance)),
+            "min_pnl": m.min,
+            "max_pnl": m.max,
+            "quantiles": {str(q): float(v) for q, v in zip(quantiles, pnl_quantiles)},
+            "var_95": float(-q05),
+            "var_99": float(-q01),
+            "es_95": -self.digest.lower_tail_mean(0.05, m.min, m.max),
+            "es_99": -self.digest.lower_tail_mean(0.01, m.min, m.max),
+            "barrier_probability": self.barrier_hits / m.count if m.count else 0.0,
+            "seed": seed,
+        }
@@ -0,0 +1,59 @@
+from statistics import NormalDist
+
+from activities.monte_carlo.accumulators import SimulationAccumulator
+
+# Statistics a run can converge on, and the lower-tail probability behind each VaR
+METRICS = ("mean_pnl", "barrier_probability", "var_95", "var_99")
+_VAR_LEVELS = {"var_95": 0.05, "var_99": 0.01}
+
+
+def precision(accumulator: SimulationAccumulator, metric: str = "mean_pnl", confidence: float = 0.95) -> dict:
+    """
+    Confidence interval of `metric` from the running accumulator alone.
+
+    - mean_pnl: normal interval from the sample variance.
+    - barrier_probability: normal approximation of the binomial proportion.
+    - var_95 / var_99: distribution-free order-statistic interval, read from the digest at the ranks
+      n*p ± z*sqrt(n*p*(1-p)).
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown convergence metric {metric!r}, expected one of {METRICS}")
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    m = accumulator.moments
+    n = max(m.count, 1)
+
+    if metric == "mean_pnl":
+        estimate = m.mean
+        half_width = z * (m.variance / n) ** 0.5
+        low, high = estimate - half_width, estimate + half_width
+    elif metric == "barrier_probability":
+        estimate = accumulator.barrier_hits / n
+        half_width = z * (estimate * (1 - estimate) / n) ** 0.5
+        low, high = estimate - half_width, estimate + half_width
+    else:
+        p = _VAR_LEVELS[metric]
+        spread = z * (p * (1 - p) / n) ** 0.5
+        # Losses: a higher P&L quantile is a lower VaR
+        q_low, estimate_q, q_high = accumulator.digest.quantile([max(p - spread, 0.0), p, min(p + spread, 1.0)],
+                                                                 m.min, m.max)
+        estimate, low, high = -float(estimate_q), -float(q_high), -float(q_low)
+
+    width = high - low
+    return {
+        "metric": metric,
+        "confidence": confidence,
+        "estimate": float(estimate),
+        "ci_low": float(low),
+        "ci_high": float(high),
+        "ci_width": float(width),
+        "relative_error": float(width / 2 / abs(estimate)) if estimate else float("inf"),
+    }
+
+
+def target_met(achieved: dict, target_ci_width: float = None, target_relative_error: float = None) -> bool:
+    """True once every target that was set is met."""
+    if target_ci_width is not None and achieved["ci_width"] > target_ci_width:
+        return False
+    if target_relative_error is not None and achieved["relative_error"] > target_relative_error:
+        return False
+    return True
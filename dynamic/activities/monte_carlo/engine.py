@@ -0,0 +1,195 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from activities.monte_carlo.accumulators import SimulationAccumulator
+from activities.monte_carlo.convergence import precision, target_met
+from activities.monte_carlo.params import QUANTILES, resolve_params
+
+_executor = None
+
+
+def get_executor(max_workers: int = None) -> ProcessPoolExecutor:
+    """
+    Process pool shared by every simulation in this worker (MC_WORKERS, default: one per core).
+
+    Uses "spawn" so children never inherit the worker's runtime threads through fork.
+    """
+    global _executor
+    if _executor is None:
+        max_workers = max_workers or int(os.getenv("MC_WORKERS", os.cpu_count() or 1))
+        _executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def is_adaptive(params: dict) -> bool:
+    return params.get("target_ci_width") is not None or params.get("target_relative_error") is not None
+
+
+def chunk_sizes(paths: int, chunk_size: int) -> list:
+    return [min(chunk_size, paths - start) for start in range(0, paths, chunk_size)]
+
+
+def chunk_seed(seed: int, index: int) -> np.random.SeedSequence:
+    """Seed of chunk `index`: the same as SeedSequence(seed).spawn(n)[index] for any n > index."""
+    return np.random.SeedSequence(seed, spawn_key=(index,))
+
+
+def simulate_chunk(params: dict, seed_sequence: np.random.SeedSequence, size: int) -> dict:
+    """
+    Simulates `size` paths with one vectorized draw and returns their P&L plus barrier hits.
+
+    The chunk's generator comes only from its own SeedSequence, so results don't depend on which process
+    ran it or in what order.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    dt = params["horizon_years"] / params["steps"]
+    drift = (params["mu"] - 0.5 * params["sigma"] ** 2) * dt
+    log_paths = rng.standard_normal((size, params["steps"]))
+    log_paths *= params["sigma"] * np.sqrt(dt)
+    log_paths += drift
+    np.cumsum(log_paths, axis=1, out=log_paths)
+
+    terminal = params["s0"] * np.exp(log_paths[:, -1])
+    minimum = params["s0"] * np.exp(np.minimum(log_paths.min(axis=1), 0.0))
+    return {"pnl": terminal - params["s0"], "barrier_hits": int(np.count_nonzero(minimum <= params["barrier"]))}
+
+
+def summarize(pnl: np.ndarray, barrier_hits: int, params: dict) -> dict:
+    losses = -pnl
+    var_95, var_99 = np.quantile(losses, [0.95, 0.99])
+    return {
+        "paths": int(pnl.size),
+        "mean_pnl": float(pnl.mean()),
+        "std_pnl": float(pnl.std(ddof=1)),
+        "min_pnl": float(pnl.min()),
+        "max_pnl": float(pnl.max()),
+        "quantiles": {str(q): float(v) for q, v in zip(QUANTILES, np.quantile(pnl, QUANTILES))},
+        "var_95": float(var_95),
+        "var_99": float(var_99),
+        "es_95": float(losses[losses >= var_95].mean()),
+        "es_99": float(losses[losses >= var_99].mean()),
+        "barrier_probability": barrier_hits / pnl.size,
+        "seed": params["seed"],
+    }
+
+
+def accumulate_chunk(params: dict, seed_sequence: np.random.SeedSequence, size: int) -> dict:
+    """Simulates one chunk and returns only its accumulator, so no samples leave the pool process."""
+    chunk = simulate_chunk(params, seed_sequence, size)
+    accumulator = SimulationAccumulator()
+    accumulator.add_chunk(chunk["pnl"], chunk["barrier_hits"])
+    return accumulator.to_dict()
+
+
+def shard_chunks(chunk_count: int, shard: int, shards: int) -> range:
+    """Contiguous chunk indexes owned by `shard` of `shards`."""
+    per_shard, remainder = divmod(chunk_count, shards)
+    start = shard * per_shard + min(shard, remainder)
+    return range(start, start + per_shard + (1 if shard < remainder else 0))
+
+
+async def _map_chunks(fn, params: dict, chunk_indexes, executor, on_chunk) -> list:
+    """Runs `fn(params, seed, size)` for the given chunks on the pool and returns the results in chunk order."""
+    # The seed tree covers the whole simulation, so chunk i draws the same paths on any host, shard or round
+    paths = (params["max_paths"] or params["paths"]) if is_adaptive(params) else params["paths"]
+    sizes = chunk_sizes(paths, params["chunk_size"])
+
+    loop = asyncio.get_running_loop()
+    futures = {
+        loop.run_in_executor(executor, fn, params, chunk_seed(params["seed"], index), sizes[index]): position
+        for position, index in enumerate(chunk_indexes)
+    }
+    results = [None] * len(futures)  # Kept in chunk order so the statistics are bit-for-bit reproducible
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                results[futures[future]] = future.result()
+            if on_chunk is not None:
+                on_chunk(len(futures) - len(pending), len(futures))
+    finally:
+        for future in pending:
+            future.cancel()  # Chunks not started yet are dropped on cancellation or failure
+    return results
+
+
+async def run_simulation(params: dict = None, executor=None, on_chunk=None) -> dict:
+    """
+    Runs the simulation in chunks on a process pool without blocking the event loop, and returns summary
+    statistics (never the paths).
+
+    :param on_chunk: Called with (chunks_done, chunks_total) on the event loop after each chunk.
+    """
+    params = resolve_params(params)
+    chunk_count = len(chunk_sizes(params["paths"], params["chunk_size"]))
+    results = await _map_chunks(simulate_chunk, params, range(chunk_count), executor or get_executor(), on_chunk)
+
+    pnl = np.concatenate([chunk["pnl"] for chunk in results])
+    return summarize(pnl, sum(chunk["barrier_hits"] for chunk in results), params)
+
+
+async def run_shard(params: dict, shard: int, shards: int, executor=None, on_chunk=None) -> dict:
+    """
+    Runs shard `shard` of `shards` of one simulation and returns its mergeable accumulator
+    (`SimulationAccumulator.to_dict()`); reduce the shards with `SimulationAccumulator.merge`.
+    """
+    params = resolve_params(params)
+    if is_adaptive(params):
+        raise ValueError("Sharded runs use a fixed path count; convergence targets apply to monte_carlo_task")
+    chunk_count = len(chunk_sizes(params["paths"], params["chunk_size"]))
+    results = await _map_chunks(accumulate_chunk, params, shard_chunks(chunk_count, shard, shards),
+                                executor or get_executor(), on_chunk)
+
+    accumulator = SimulationAccumulator()
+    for chunk in results:
+        accumulator.merge(SimulationAccumulator.from_dict(chunk))
+    return accumulator.to_dict()
+
+
+async def run_until_converged(params: dict = None, executor=None, on_round=None) -> dict:
+    """
+    Samples in rounds of `round_paths` until the confidence interval of `convergence_metric` meets
+    `target_ci_width` and/or `target_relative_error`, or `max_paths` is spent.
+
+    Rounds continue the same chunk sequence, so stopping early returns exactly the first chunks of the
+    corresponding fixed-size run.
+
+    :param on_round: Called with the precision reached after each round (incl. "paths_used").
+    """
+    params = resolve_params(params)
+    if not is_adaptive(params):
+        raise ValueError("Set target_ci_width and/or target_relative_error for a convergence-driven run")
+    executor = executor or get_executor()
+    chunk_count = len(chunk_sizes(params["max_paths"] or params["paths"], params["chunk_size"]))
+    chunks_per_round = max(1, params["round_paths"] // params["chunk_size"])
+
+    accumulator = SimulationAccumulator()
+    next_chunk = 0
+    rounds = 0
+    achieved = None
+    while next_chunk < chunk_count:
+        round_chunks = range(next_chunk, min(next_chunk + chunks_per_round, chunk_count))
+        for chunk in await _map_chunks(accumulate_chunk, params, round_chunks, executor, None):
+            accumulator.merge(SimulationAccumulator.from_dict(chunk))
+        next_chunk = round_chunks.stop
+        rounds += 1
+
+        achieved = precision(accumulator, params["convergence_metric"], params["confidence"])
+        if on_round is not None:
+            on_round({**achieved, "paths_used": accumulator.moments.count})
+        if target_met(achieved, params["target_ci_width"], params["target_relative_error"]):
+            break
+
+    return {
+        **accumulator.summary(QUANTILES, params["seed"]),
+        "converged": target_met(achieved, params["target_ci_width"], params["target_relative_error"]),
+        "precision": achieved,
+        "paths_used": accumulator.moments.count,
+        "max_paths": params["max_paths"] or params["paths"],
+        "rounds": rounds,
+    }
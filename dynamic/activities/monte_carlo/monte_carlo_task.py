@@ -1,6 +1,51 @@
 from temporalio import activity
 
+from activities.monte_carlo.accumulators import SimulationAccumulator
+from activities.monte_carlo.engine import is_adaptive, run_shard, run_simulation, run_until_converged
+from activities.monte_carlo.params import QUANTILES, resolve_params
+
+
+@activity.defn
+async def monte_carlo_task(name: str, params: dict = None):
+    """
+    Monte Carlo risk simulation for `name` (see params.DEFAULT_PARAMS for `params`).
+
+    Chunks run on the worker's process pool; the activity only awaits them, heartbeating its progress,
+    and returns summary statistics. With a target_ci_width / target_relative_error it samples in rounds
+    and stops as soon as the target is met, reporting the precision reached and the paths used.
+    """
+    def on_chunk(done: int, total: int):
+        activity.heartbeat({"chunks_done": done, "chunks": total})
+
+    def on_round(achieved: dict):
+        activity.heartbeat(achieved)
+
+    if is_adaptive(resolve_params(params)):
+        summary = await run_until_converged(params, on_round=on_round)
+    else:
+        summary = await run_simulation(params, on_chunk=on_chunk)
+    return {"task": f"MonteCarlo for {name}", **summary}
+
+
+@activity.defn
+async def monte_carlo_shard(params: dict, shard: int, shards: int) -> dict:
+    """
+    One shard of a simulation split across workers by DynamicWorkflow. Returns a mergeable accumulator
+    (a few KB), never samples.
+    """
+    def on_chunk(done: int, total: int):
+        activity.heartbeat({"shard": shard, "chunks_done": done, "chunks": total})
+
+    return await run_shard(params, shard, shards, on_chunk=on_chunk)
+
 
 @activity.defn
-async def monte_carlo_task(name: str):
-    return f"Executed MonteCarlo for {name}"
\ No newline at end of file
+async def monte_carlo_reduce(accumulators: list, seed: int) -> dict:
+    """
+    Merges shard accumulators, in the order given, into the simulation summary. Runs as an activity so the
+    workflow worker never imports numpy.
+    """
+    total = SimulationAccumulator()
+    for accumulator in accumulators:
+        total.merge(SimulationAccumulator.from_dict(accumulator))
+    return total.summary(QUANTILES, seed)
@@ -0,0 +1,33 @@
+"""
+Monte Carlo parameters. Kept free of numpy and the process pool: DynamicWorkflow pins them in workflow code,
+and the workflow worker must not import the simulation engine to do so.
+"""
+
+# Geometric Brownian motion position, simulated on a daily grid
+DEFAULT_PARAMS = {
+    "paths": 1_000_000,
+    "chunk_size": 10_000,  # Paths per chunk: chunk_size x steps float64 increments are in memory at once
+    "steps": 252,
+    "horizon_years": 1.0,
+    "s0": 100.0,
+    "mu": 0.05,
+    "sigma": 0.2,
+    "barrier": 70.0,  # Reports the probability that a path touches this level
+    "seed": 42,
+    # Early stopping: set a target to sample in rounds until it is met, within max_paths (default: paths)
+    "target_ci_width": None,
+    "target_relative_error": None,  # CI half-width / |estimate|
+    "convergence_metric": "mean_pnl",  # See convergence.METRICS
+    "confidence": 0.95,
+    "round_paths": 100_000,
+    "max_paths": None,
+}
+
+QUANTILES = (0.01, 0.05, 0.5, 0.95, 0.99)
+
+
+def resolve_params(params: dict = None) -> dict:
+    unknown = set(params or {}) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown Monte Carlo parameters: {sorted(unknown)}")
+    return {**DEFAULT_PARAMS, **(params or {})}
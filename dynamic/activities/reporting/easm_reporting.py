@@ -1,6 +1,40 @@
+import asyncio
+import os
+
 from temporalio import activity
+from temporalio.exceptions import ApplicationError
+
+from activities.reporting.report_builder import DEFAULT_CHUNK_SIZE, ReportBuilder
 
 
 @activity.defn
-async def easm_reporting_task(name: str):
-    return f"Executed EASM Reporting for {name}"
\ No newline at end of file
+async def easm_reporting_task(name: str, request: dict = None):
+    """
+    Builds the EASM report for `name` from an NDJSON asset inventory, streaming it in chunks and
+    recomputing only the sections whose assets changed since the previous run (see report_builder).
+
+    `request` keys (defaults from EASM_* env vars): inventory_path, state_path, output_path, section_key,
+    chunk_size, top_n. Returns a run summary, not the report.
+    """
+    request = request or {}
+    base_dir = os.getenv("EASM_DATA_DIR", ".")
+    builder = ReportBuilder(
+        state_path=request.get("state_path") or os.path.join(base_dir, f"{name}.easm_state.sqlite"),
+        section_key=request.get("section_key") or os.getenv("EASM_SECTION_KEY", "business_unit"),
+        chunk_size=int(request.get("chunk_size") or os.getenv("EASM_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)),
+        top_n=int(request.get("top_n") or 10),
+    )
+    inventory_path = request.get("inventory_path") or os.path.join(base_dir, f"{name}.inventory.ndjson")
+    output_path = request.get("output_path") or os.path.join(base_dir, f"{name}.easm_report.json")
+
+    if not os.path.exists(inventory_path):
+        raise ApplicationError(f"Asset inventory {inventory_path} not found", type="InventoryNotFound",
+                               non_retryable=True)
+
+    loop = asyncio.get_running_loop()
+
+    def on_progress(pass_number: int, assets_read: int):
+        loop.call_soon_threadsafe(activity.heartbeat, {"pass": pass_number, "assets_read": assets_read})
+
+    summary = await asyncio.to_thread(builder.build, inventory_path, output_path, on_progress=on_progress)
+    return {"task": f"EASM Reporting for {name}", **summary}
@@ -0,0 +1,243 @@
+"""
+Streaming, incremental EASM report builder.
+
+The inventory is NDJSON (optionally gzipped), one asset per line, e.g.:
+
+    {"asset_id": "a-1", "type": "domain", "business_unit": "payments", "internet_exposed": true,
+     "open_ports": [443], "vulnerabilities": [{"id": "CVE-...", "severity": "high"}],
+     "tls_expires_at": "2026-03-01"}
+
+A run makes two passes over it, `chunk_size` assets at a time:
+
+1. Digest every asset (SHA-256 of its canonical JSON) into a staging table of the state database and find
+   the sections (values of `section_key`) whose assets were added, changed, moved or removed.
+2. Re-aggregate only those sections; every other section's statistics come from the previous run.
+
+Digests and section statistics are committed in one transaction at the end, so an interrupted run changes
+nothing. Memory holds one chunk plus one aggregate per changed section, whatever the inventory size.
+"""
+import datetime
+import gzip
+import hashlib
+import heapq
+import json
+import os
+import sqlite3
+from collections import Counter
+from itertools import islice
+
+DEFAULT_CHUNK_SIZE = 10_000
+SEVERITY_WEIGHTS = {"critical": 10, "high": 5, "medium": 2, "low": 1}
+EXPIRY_WINDOW_DAYS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (asset_id TEXT PRIMARY KEY, section TEXT NOT NULL, digest TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS sections (section TEXT PRIMARY KEY, stats TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def iter_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yields lists of at most `chunk_size` assets from an NDJSON (or .gz) inventory."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        records = (json.loads(line) for line in f if line.strip())
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def asset_digest(asset: dict) -> str:
+    return hashlib.sha256(json.dumps(asset, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def risk_score(asset: dict) -> int:
+    score = sum(SEVERITY_WEIGHTS.get(str(v.get("severity", "")).lower(), 0) for v in asset.get("vulnerabilities", ()))
+    if asset.get("internet_exposed"):
+        score += len(asset.get("open_ports", ()))
+    return score
+
+
+class SectionStats:
+    """
+    Incremental statistics of one report section. Everything is independent of the report date (certificate
+    expiries are kept per day), so unchanged sections can be reused on later days.
+    """
+
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.assets = 0
+        self.internet_exposed = 0
+        self.by_type = Counter()
+        self.open_ports = Counter()
+        self.vulnerabilities = Counter()
+        self.cert_expiry_days = Counter()
+        self._top_risk = []  # Min-heap of (score, asset_id), at most top_n entries
+
+    def add(self, asset: dict):
+        self.assets += 1
+        self.internet_exposed += bool(asset.get("internet_exposed"))
+        self.by_type[asset.get("type", "unknown")] += 1
+        self.open_ports.update(str(port) for port in asset.get("open_ports", ()))
+        self.vulnerabilities.update(str(v.get("severity", "unknown")).lower() for v in asset.get("vulnerabilities", ()))
+        if asset.get("tls_expires_at"):
+            self.cert_expiry_days[str(asset["tls_expires_at"])[:10]] += 1
+
+        score = risk_score(asset)
+        if score > 0:
+            entry = (score, str(asset["asset_id"]))
+            if len(self._top_risk) < self.top_n:
+                heapq.heappush(self._top_risk, entry)
+            elif entry > self._top_risk[0]:
+                heapq.heapreplace(self._top_risk, entry)
+
+    def to_dict(self) -> dict:
+        return {
+            "assets": self.assets,
+            "internet_exposed": self.internet_exposed,
+            "by_type": dict(self.by_type),
+            "open_ports": dict(self.open_ports),
+            "vulnerabilities": dict(self.vulnerabilities),
+            "cert_expiry_days": dict(self.cert_expiry_days),
+            "top_risk": [{"asset_id": asset_id, "score": score} for score, asset_id in sorted(self._top_risk, reverse=True)],
+        }
+
+
+def render_section(stats: dict, as_of: datetime.date) -> dict:
+    """Adds the date-dependent certificate figures to stored section statistics."""
+    today = as_of.isoformat()
+    horizon = (as_of + datetime.timedelta(days=EXPIRY_WINDOW_DAYS)).isoformat()
+    expiries = stats["cert_expiry_days"]
+    section = {key: value for key, value in stats.items() if key != "cert_expiry_days"}
+    section["certificates"] = {
+        "total": sum(expiries.values()),
+        "expired": sum(count for day, count in expiries.items() if day < today),
+        f"expiring_{EXPIRY_WINDOW_DAYS}d": sum(count for day, count in expiries.items() if today <= day < horizon),
+    }
+    return section
+
+
+def _merge_totals(totals: dict, section: dict):
+    for key in ("assets", "internet_exposed"):
+        totals[key] = totals.get(key, 0) + section[key]
+    for key in ("by_type", "open_ports", "vulnerabilities", "certificates"):
+        counter = totals.setdefault(key, Counter())
+        counter.update(section[key])
+
+
+class ReportBuilder:
+    """Builds the report from an inventory, reusing the previous run's state in `state_path` (SQLite)."""
+
+    def __init__(self, state_path: str, section_key: str = "business_unit", chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 top_n: int = 10):
+        self.state_path = state_path
+        self.section_key = section_key
+        self.chunk_size = chunk_size
+        self.top_n = top_n
+
+    def _section_of(self, asset: dict) -> str:
+        return str(asset.get(self.section_key) or "unassigned")
+
+    def build(self, inventory_path: str, output_path: str, as_of: datetime.date = None, on_progress=None) -> dict:
+        """
+        :param on_progress: Called with (pass_number, assets_read) after each chunk.
+        :return: Run summary (paths, asset/section counts, recomputed vs reused sections).
+        """
+        as_of = as_of or datetime.date.today()
+        connection = sqlite3.connect(self.state_path, isolation_level=None)
+        try:
+            connection.executescript(_SCHEMA)
+            connection.execute("CREATE TEMP TABLE staged (asset_id TEXT PRIMARY KEY, section TEXT, digest TEXT)")
+
+            # Pass 1: digests only
+            assets_read = 0
+            for chunk in iter_chunks(inventory_path, self.chunk_size):
+                connection.executemany(
+                    "INSERT OR REPLACE INTO staged VALUES (?, ?, ?)",
+                    [(str(asset["asset_id"]), self._section_of(asset), asset_digest(asset)) for asset in chunk],
+                )
+                assets_read += len(chunk)
+                if on_progress is not None:
+                    on_progress(1, assets_read)
+
+            dirty = self._dirty_sections(connection)
+
+            # Pass 2: re-aggregate the changed sections only
+            stats = {}
+            if dirty:
+                assets_read = 0
+                for chunk in iter_chunks(inventory_path, self.chunk_size):
+                    for asset in chunk:
+                        section = self._section_of(asset)
+                        if section in dirty:
+                            stats.setdefault(section, SectionStats(self.top_n)).add(asset)
+                    assets_read += len(chunk)
+                    if on_progress is not None:
+                        on_progress(2, assets_read)
+
+            self._commit(connection, dirty, stats)
+            summary = self._write_report(connection, output_path, as_of)
+        finally:
+            connection.close()
+
+        total_sections = summary["sections"]
+        return {**summary, "recomputed_sections": len(stats), "reused_sections": total_sections - len(stats),
+                "removed_sections": len(dirty - set(stats))}
+
+    def _config(self) -> str:
+        return json.dumps({"section_key": self.section_key, "top_n": self.top_n, "schema": 1}, sort_keys=True)
+
+    def _dirty_sections(self, connection) -> set:
+        """Sections to recompute or remove. Reads only: the state changes in `_commit`'s transaction."""
+        previous_config = connection.execute("SELECT value FROM meta WHERE key = 'config'").fetchone()
+        if previous_config is None or previous_config[0] != self._config():
+            # Different sectioning or statistics: nothing from the previous run can be reused, so every new
+            # section is recomputed and every old one replaced or removed
+            rows = connection.execute("SELECT DISTINCT section FROM staged UNION SELECT section FROM sections")
+            return {row[0] for row in rows}
+
+        rows = connection.execute("""
+            SELECT s.section FROM staged s LEFT JOIN assets a ON a.asset_id = s.asset_id
+             WHERE a.asset_id IS NULL OR a.digest != s.digest
+            UNION
+            SELECT a.section FROM assets a LEFT JOIN staged s ON s.asset_id = a.asset_id
+             WHERE s.asset_id IS NULL OR s.digest != a.digest
+            UNION
+            SELECT DISTINCT section FROM staged WHERE section NOT IN (SELECT section FROM sections)
+        """).fetchall()
+        return {row[0] for row in rows}
+
+    def _commit(self, connection, dirty: set, stats: dict):
+        """Replaces digests and changed sections in one transaction: a crash before this leaves the old state."""
+        connection.execute("BEGIN")
+        try:
+            connection.execute("DELETE FROM assets")
+            connection.execute("INSERT INTO assets SELECT asset_id, section, digest FROM staged")
+            connection.executemany("DELETE FROM sections WHERE section = ?", [(section,) for section in dirty])
+            connection.executemany(
+                "INSERT INTO sections VALUES (?, ?)",
+                [(section, json.dumps(section_stats.to_dict())) for section, section_stats in stats.items()],
+            )
+            connection.execute("INSERT OR REPLACE INTO meta VALUES ('config', ?)", (self._config(),))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _write_report(self, connection, output_path: str, as_of: datetime.date) -> dict:
+        """Streams the report to `output_path`, one section at a time."""
+        totals = {}
+        sections = 0
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(f'{{"as_of": "{as_of.isoformat()}", "section_key": {json.dumps(self.section_key)}, "sections": {{')
+            for section, stats_json in connection.execute("SELECT section, stats FROM sections ORDER BY section"):
+                rendered = render_section(json.loads(stats_json), as_of)
+                _merge_totals(totals, rendered)
+                f.write(f'{"," if sections else ""}{json.dumps(section)}: {json.dumps(rendered)}')
+                sections += 1
+            f.write(f'}}, "totals": {json.dumps(totals)}}}')
+        os.replace(tmp_path, output_path)
+        return {"report_path": output_path, "assets": totals.get("assets", 0), "sections": sections}
@@ -0,0 +1,219 @@
+"""
+Batch risk scoring: one feature matrix per batch, scored with a single matrix-vector product.
+
+Entities look like EASM assets (see activities.reporting.report_builder), plus an optional `version` or
+`updated_at` that identifies a revision of the entity:
+
+    {"entity_id": "a-1", "version": 7, "type": "domain", "internet_exposed": true, "open_ports": [22, 443],
+     "vulnerabilities": [{"severity": "high"}], "tls_expires_at": "2026-03-01"}
+
+Feature rows are cached per (entity_id, version), so rescoring the same entities with new weights only
+runs the matrix product. Entities without an id or a version are extracted every time.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+SEVERITIES = ("critical", "high", "medium", "low")
+RISKY_PORTS = frozenset({21, 22, 23, 445, 1433, 3306, 3389, 5432, 5900, 6379, 9200, 27017})
+ASSET_TYPES = ("domain", "ip", "certificate", "cloud")
+
+FEATURES = (
+    *(f"vulns_{severity}" for severity in SEVERITIES),
+    "open_ports",
+    "risky_ports",
+    "internet_exposed",
+    "has_tls",
+    *(f"type_{asset_type}" for asset_type in ASSET_TYPES),
+)
+
+DEFAULT_MODEL = {
+    "weights": {
+        "vulns_critical": 1.5, "vulns_high": 0.8, "vulns_medium": 0.3, "vulns_low": 0.05,
+        "open_ports": 0.1, "risky_ports": 0.6, "internet_exposed": 1.2, "has_tls": -0.3,
+        "type_domain": 0.0, "type_ip": 0.2, "type_certificate": -0.2, "type_cloud": 0.1,
+    },
+    "bias": -3.0,
+    # Lower bounds of each tier on the 0-100 score, highest first
+    "tiers": {"critical": 90.0, "high": 70.0, "medium": 40.0, "low": 0.0},
+}
+
+DEFAULT_CACHE_SIZE = 1_000_000
+
+_FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+_OPEN_PORTS, _RISKY_PORTS, _INTERNET_EXPOSED, _HAS_TLS = (
+    _FEATURE_INDEX[name] for name in ("open_ports", "risky_ports", "internet_exposed", "has_tls"))
+_SEVERITY_CODES = {severity: i for i, severity in enumerate(SEVERITIES)}
+_TYPE_COLUMNS = {asset_type: _FEATURE_INDEX[f"type_{asset_type}"] for asset_type in ASSET_TYPES}
+_RISKY_PORT_ARRAY = np.array(sorted(RISKY_PORTS))
+_feature_cache = None
+_feature_cache_lock = threading.Lock()
+
+
+def extract_matrix(entities: list) -> np.ndarray:
+    """
+    (len(entities), len(FEATURES)) float32 feature matrix, built column-wise: one pass of list
+    comprehensions pulls the raw fields out of the dicts, then every count is a NumPy bincount.
+    """
+    n = len(entities)
+    matrix = np.zeros((n, len(FEATURES)), dtype=np.float32)
+    if n == 0:
+        return matrix
+    rows = np.arange(n)
+
+    vulnerabilities = [entity.get("vulnerabilities") or () for entity in entities]
+    severity_codes = np.fromiter(
+        (_SEVERITY_CODES.get(str(v.get("severity", "")).lower(), -1) for vs in vulnerabilities for v in vs), dtype=np.int64)
+    owners = np.repeat(rows, [len(vs) for vs in vulnerabilities])
+    known = severity_codes >= 0
+    matrix[:, :len(SEVERITIES)] = np.bincount(owners[known] * len(SEVERITIES) + severity_codes[known],
+                                              minlength=n * len(SEVERITIES)).reshape(n, len(SEVERITIES))
+
+    ports = [entity.get("open_ports") or () for entity in entities]
+    port_counts = [len(p) for p in ports]
+    flat_ports = np.fromiter((port for p in ports for port in p), dtype=np.int64)
+    matrix[:, _OPEN_PORTS] = port_counts
+    matrix[:, _RISKY_PORTS] = np.bincount(np.repeat(rows, port_counts)[np.isin(flat_ports, _RISKY_PORT_ARRAY)],
+                                          minlength=n)
+
+    matrix[:, _INTERNET_EXPOSED] = [bool(entity.get("internet_exposed")) for entity in entities]
+    matrix[:, _HAS_TLS] = [bool(entity.get("tls_expires_at")) for entity in entities]
+    type_columns = np.array([_TYPE_COLUMNS.get(entity.get("type"), -1) for entity in entities])
+    typed = type_columns >= 0
+    matrix[rows[typed], type_columns[typed]] = 1.0
+    return matrix
+
+
+def cache_key(entity: dict):
+    """(entity_id, version), or None (not cached) when the entity lacks either."""
+    entity_id = entity.get("entity_id")
+    version = entity.get("version", entity.get("updated_at"))
+    return None if entity_id is None or version is None else (entity_id, version)
+
+
+class FeatureCache:
+    """
+    LRU cache of feature rows. Rows live in one float32 slab (grown by doubling up to `capacity`) and the
+    OrderedDict maps key -> slot, so an entry costs a dict slot rather than a small array object.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CACHE_SIZE, width: int = len(FEATURES)):
+        self.capacity = capacity
+        self._rows = np.empty((min(capacity, 1024), width), dtype=np.float32)
+        self._slots = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def fill(self, keys: list, matrix: np.ndarray) -> list:
+        """Copies cached rows into `matrix` and returns the positions of `keys` that missed."""
+        positions, slots, missing = [], [], []
+        with self._lock:
+            for position, key in enumerate(keys):
+                slot = self._slots.get(key) if key is not None else None
+                if slot is None:
+                    missing.append(position)
+                else:
+                    self._slots.move_to_end(key)
+                    positions.append(position)
+                    slots.append(slot)
+            if positions:
+                matrix[positions] = self._rows[slots]
+            self.hits += len(positions)
+            self.misses += len(missing)
+        return missing
+
+    def store(self, keys: list, rows: np.ndarray):
+        with self._lock:
+            positions, slots = [], []
+            for position, key in enumerate(keys):
+                if key is None:
+                    continue
+                slot = self._slots.get(key)
+                if slot is not None:
+                    self._slots.move_to_end(key)
+                elif len(self._slots) < self.capacity:
+                    slot = len(self._slots)
+                    self._slots[key] = slot
+                else:
+                    _, slot = self._slots.popitem(last=False)
+                    self._slots[key] = slot
+                    self.evictions += 1
+                positions.append(position)
+                slots.append(slot)
+            if len(self._slots) > len(self._rows):
+                grown = np.empty((min(self.capacity, max(len(self._slots), 2 * len(self._rows))),
+                                  self._rows.shape[1]), dtype=np.float32)
+                grown[:len(self._rows)] = self._rows
+                self._rows = grown
+            # One scatter; when a slot is reused within the batch the last write wins, as it would in order
+            self._rows[slots] = rows[positions]
+
+    def stats(self) -> dict:
+        return {"entries": len(self._slots), "capacity": self.capacity, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+
+def get_feature_cache() -> FeatureCache:
+    """Cache shared by every scoring run in this worker (SCORING_CACHE_SIZE rows, 0 disables it)."""
+    global _feature_cache
+    with _feature_cache_lock:
+        if _feature_cache is None:
+            _feature_cache = FeatureCache(int(os.getenv("SCORING_CACHE_SIZE", DEFAULT_CACHE_SIZE)))
+        return _feature_cache
+
+
+def resolve_model(model: dict = None) -> dict:
+    model = {**DEFAULT_MODEL, **(model or {})}
+    unknown = set(model["weights"]) - set(FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown scoring features: {sorted(unknown)}")
+    return {**model, "weights": {**DEFAULT_MODEL["weights"], **model["weights"]}}
+
+
+def feature_matrix(entities: list, cache: FeatureCache = None) -> np.ndarray:
+    """Feature matrix of a batch; only the cache misses go through `extract_matrix`."""
+    if cache is None or cache.capacity == 0:
+        return extract_matrix(entities)
+
+    matrix = np.empty((len(entities), len(FEATURES)), dtype=np.float32)
+    keys = [cache_key(entity) for entity in entities]
+    missing = cache.fill(keys, matrix)
+    if missing:
+        matrix[missing] = extract_matrix([entities[position] for position in missing])
+        cache.store([keys[position] for position in missing], matrix[missing])
+    return matrix
+
+
+def score_matrix(matrix: np.ndarray, model: dict) -> np.ndarray:
+    """Logistic score on 0-100 for every row."""
+    weights = np.array([model["weights"][name] for name in FEATURES], dtype=np.float32)
+    logits = matrix @ weights + np.float32(model["bias"])
+    return 100.0 / (1.0 + np.exp(-logits.astype(np.float64)))
+
+
+def assign_tiers(scores: np.ndarray, tiers: dict) -> np.ndarray:
+    """Index into `tiers` (highest first) of each score."""
+    ordered = sorted(tiers.items(), key=lambda tier: tier[1])
+    bounds = np.array([bound for _, bound in ordered[1:]])
+    return len(ordered) - 1 - np.searchsorted(bounds, scores, side="right")
+
+
+def score_entities(entities: list, model: dict = None, cache: FeatureCache = None) -> dict:
+    """Scores a batch and returns scores in entity order, tier counts and the cache statistics."""
+    model = resolve_model(model)
+    scores = score_matrix(feature_matrix(entities, cache), model)
+    tier_names = [name for name, _ in sorted(model["tiers"].items(), key=lambda tier: -tier[1])]
+    tier_counts = np.bincount(assign_tiers(scores, model["tiers"]), minlength=len(tier_names))
+    return {
+        "entities": len(entities),
+        "scores": np.round(scores, 3).tolist(),
+        "tiers": dict(zip(tier_names, tier_counts.tolist())),
+        "cache": cache.stats() if cache is not None else None,
+    }
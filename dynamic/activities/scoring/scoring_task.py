@@ -0,0 +1,20 @@
+import asyncio
+
+from temporalio import activity
+
+from activities.scoring.engine import get_feature_cache, score_entities
+
+
+@activity.defn
+async def scoring_task(name: str, request: dict = None):
+    """
+    Scores a batch of entities for `name`. `request` is {"entities": [...], "model": {...}} (see
+    engine.DEFAULT_MODEL); returns the scores in entity order and per-tier counts.
+
+    Feature rows come from the worker's LRU cache where possible, so rescoring with new weights skips
+    extraction. The NumPy work runs in a thread to keep the event loop free for heartbeats.
+    """
+    request = request or {}
+    summary = await asyncio.to_thread(score_entities, request.get("entities", []), request.get("model"),
+                                      get_feature_cache())
+    return {"task": f"Scoring for {name}", **summary}
@@ -0,0 +1,145 @@
+import ast
+import asyncio
+import importlib
+import importlib.util
+import inspect
+import json
+import os
+import tempfile
+import threading
+from typing import Sequence
+
+from temporalio import activity
+from temporalio.common import RawValue
+from temporalio.exceptions import ApplicationError
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".activity_index.json")
+
+
+def _activity_names(source: str, filename: str) -> list:
+    """Names of the `@activity.defn` functions in a module's source, found without importing it."""
+    names = []
+    for node in ast.walk(ast.parse(source, filename)):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            call = decorator if isinstance(decorator, ast.Call) else None
+            target = call.func if call else decorator
+            is_defn = (isinstance(target, ast.Attribute) and target.attr == "defn") or \
+                      (isinstance(target, ast.Name) and target.id == "defn")
+            if not is_defn:
+                continue
+            keywords = {kw.arg: kw.value for kw in call.keywords} if call else {}
+            if isinstance(keywords.get("dynamic"), ast.Constant) and keywords["dynamic"].value:
+                continue
+            name = keywords.get("name")
+            names.append(name.value if isinstance(name, ast.Constant) else node.name)
+    return names
+
+
+def build_activity_index(package_name: str = "activities", package_dir: str = None,
+                         index_path: str = DEFAULT_INDEX_PATH) -> dict:
+    """
+    Builds the activity name -> module index for every module under a package by parsing (not importing)
+    the sources. Modules whose mtime and size are unchanged are served from the index file.
+    """
+    if package_dir is None:
+        spec = importlib.util.find_spec(package_name)
+        package_dir = os.path.dirname(spec.origin)
+
+    previous = {}
+    if index_path:
+        try:
+            with open(index_path) as f:
+                cached = json.load(f)
+            if cached.get("package") == package_name:
+                previous = cached.get("modules", {})
+        except (OSError, ValueError):
+            pass
+
+    modules = {}
+    for root, dirs, files in os.walk(package_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith((".", "__")))
+        for filename in sorted(files):
+            if not filename.endswith(".py") or filename == "__init__.py":
+                continue
+            path = os.path.join(root, filename)
+            relative = os.path.relpath(path, package_dir)[:-3].replace(os.sep, ".")
+            module_name = f"{package_name}.{relative}"
+            stat = os.stat(path)
+            entry = previous.get(module_name)
+            if not entry or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                with open(path) as f:
+                    entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                             "activities": _activity_names(f.read(), path)}
+            modules[module_name] = entry
+
+    index = {}
+    for module_name, entry in modules.items():
+        for name in entry["activities"]:
+            if name in index:
+                raise ValueError(f"Activity {name} is defined in both {index[name]} and {module_name}")
+            index[name] = module_name
+
+    if index_path and modules != previous:
+        _write_index(index_path, {"package": package_name, "modules": modules})
+    return index
+
+
+def _write_index(index_path: str, index: dict):
+    """
+    Atomically replaces the index file. Supervisor children rebuild it concurrently, so each writes its own
+    temp file; whichever replace lands last wins, and an index that can't be written is simply skipped.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(index_path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+class LazyActivityResolver:
+    """Imports an activity's module the first time the activity runs and caches the callable."""
+
+    def __init__(self, index: dict):
+        self.index = index
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, name: str):
+        fn = self._loaded.get(name)
+        if fn is not None:
+            return fn
+        with self._lock:
+            if name not in self._loaded:
+                if name not in self.index:
+                    raise LookupError(f"Unknown activity {name}")
+                module = importlib.import_module(self.index[name])
+                self._loaded[name] = next(
+                    func for _, func in inspect.getmembers(module, inspect.isfunction)
+                    if getattr(getattr(func, "__temporal_activity_definition", None), "name", None) == name
+                )
+            return self._loaded[name]
+
+
+def lazy_activity(resolver: LazyActivityResolver):
+    """Dynamic activity that runs any indexed activity by name, so the worker registers just this one."""
+
+    @activity.defn(dynamic=True)
+    async def run_indexed_activity(args: Sequence[RawValue]):
+        try:
+            fn = resolver.resolve(activity.info().activity_type)
+        except LookupError as e:
+            raise ApplicationError(str(e), type="UnknownActivity", non_retryable=True) from e
+        definition = getattr(fn, "__temporal_activity_definition")
+        values = activity.payload_converter().from_payloads([arg.payload for arg in args], definition.arg_types)
+        if inspect.iscoroutinefunction(fn):
+            return await fn(*values)
+        return await asyncio.to_thread(fn, *values)
+
+    return run_indexed_activity
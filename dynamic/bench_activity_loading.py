@@ -0,0 +1,107 @@
+"""
+Compares dynamic-worker startup with eager discovery (import every module in the activities package, as
+`discovery.discover_activities` does) vs. the lazy name -> module index, for generated packages of
+10/100/500 activity modules. Each module allocates `--module-kb` at import time to stand in for heavy
+dependencies.
+
+Each measurement runs in a fresh process, so cold-start time and peak RSS are independent:
+
+    python bench_activity_loading.py --counts 10 100 500 --module-kb 512
+"""
+import argparse
+import importlib
+import inspect
+import multiprocessing
+import os
+import pkgutil
+import resource
+import sys
+import tempfile
+import time
+
+ACTIVITY_TEMPLATE = '''from temporalio import activity
+
+HEAVY_STATE = bytearray({module_kb} * 1024)  # Stand-in for a heavy dependency loaded at import time
+
+
+@activity.defn
+async def bench_activity_{index}(name: str):
+    return f"Executed {index} for {{name}}"
+'''
+
+
+def make_package(root: str, name: str, count: int, module_kb: int):
+    package_dir = os.path.join(root, name)
+    os.makedirs(package_dir)
+    open(os.path.join(package_dir, "__init__.py"), "w").close()
+    for index in range(count):
+        with open(os.path.join(package_dir, f"activity_{index}.py"), "w") as f:
+            f.write(ACTIVITY_TEMPLATE.format(index=index, module_kb=module_kb))
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # ru_maxrss is KiB on Linux
+
+
+def discover_eager(package):
+    """What the dynamic worker used to do at startup."""
+    found = []
+    for _, module_name, is_pkg in pkgutil.walk_packages(package.__path__, package.__name__ + "."):
+        if not is_pkg:
+            module = importlib.import_module(module_name)
+            found.extend(func for _, func in inspect.getmembers(module, inspect.isfunction))
+    return found
+
+
+def run_mode(mode: str, root: str, package_name: str, index_path: str, queue):
+    sys.path.insert(0, root)
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "eager":
+        discover_eager(importlib.import_module(package_name))
+    else:
+        from activity_index import LazyActivityResolver, build_activity_index
+        index = build_activity_index(package_name, os.path.join(root, package_name), index_path)
+        resolver = LazyActivityResolver(index)
+    startup = time.perf_counter() - start
+
+    # First call of one activity (lazy mode imports its module here)
+    start = time.perf_counter()
+    if mode != "eager":
+        resolver.resolve("bench_activity_0")
+    first_call = time.perf_counter() - start
+
+    queue.put((mode, startup, first_call, peak_rss_mb(), peak_rss_mb() - rss_before))
+
+
+def measure(mode: str, root: str, package_name: str, index_path: str):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=run_mode, args=(mode, root, package_name, index_path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--module-kb", type=int, default=512)
+    args = parser.parse_args()
+
+    print(f"{'modules':>8}  {'mode':<12}{'startup ms':>12}{'first call ms':>15}{'peak RSS MB':>13}{'RSS delta MB':>14}")
+    with tempfile.TemporaryDirectory() as root:
+        for count in args.counts:
+            package_name = f"bench_activities_{count}"
+            make_package(root, package_name, count, args.module_kb)
+            index_path = os.path.join(root, f"{package_name}.index.json")
+
+            # "lazy" builds the index from the sources, "lazy-cached" reuses the index file it wrote
+            for mode in ("eager", "lazy", "lazy-cached"):
+                name, startup, first_call, peak, delta = measure(mode, root, package_name, index_path)
+                print(f"{count:>8}  {name:<12}{startup * 1000:>12.1f}{first_call * 1000:>15.1f}{peak:>13.1f}"
+                      f"{delta:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
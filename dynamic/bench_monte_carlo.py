@@ -0,0 +1,93 @@
+"""
+Benchmarks the Monte Carlo engine behind `monte_carlo_task`: paths/sec on process pools of 1..N workers,
+against a single in-process vectorized run. Summary statistics must match for every pool size (per-chunk
+SeedSequence streams).
+
+With --shards, also runs the simulation as N shard accumulators (what DynamicWorkflow spreads across
+workers), merges them, and reports how far the merged summary is from the exact single-node one.
+
+    python bench_monte_carlo.py --paths 1000000 --workers 1 2 4 8 --shards 8
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from activities.monte_carlo.accumulators import SimulationAccumulator
+from activities.monte_carlo.engine import (QUANTILES, chunk_sizes, resolve_params, run_shard, run_simulation,
+                                           simulate_chunk, summarize)
+
+
+def run_inline(params: dict) -> dict:
+    """Same chunks, one after another in this process (no pool)."""
+    params = resolve_params(params)
+    sizes = chunk_sizes(params["paths"], params["chunk_size"])
+    chunks = [simulate_chunk(params, seed, size)
+              for seed, size in zip(np.random.SeedSequence(params["seed"]).spawn(len(sizes)), sizes)]
+    return summarize(np.concatenate([c["pnl"] for c in chunks]), sum(c["barrier_hits"] for c in chunks), params)
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paths", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1))))
+    parser.add_argument("--shards", type=int, default=0)
+    args = parser.parse_args()
+    params = {"paths": args.paths, "chunk_size": args.chunk_size}
+
+    print(f"{cores} cores")
+    print(f"{'mode':<12}{'seconds':>10}{'paths/sec':>14}{'speedup':>9}  {'VaR 99':>8}")
+    start = time.perf_counter()
+    baseline = run_inline(params)
+    inline_seconds = time.perf_counter() - start
+    print(f"{'inline':<12}{inline_seconds:>10.2f}{args.paths / inline_seconds:>14,.0f}{1:>9.2f}  {baseline['var_99']:>8.3f}")
+
+    for workers in args.workers:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pool.submit(int).result()  # Start the pool before timing
+            start = time.perf_counter()
+            summary = asyncio.run(run_simulation(params, executor=pool))
+            elapsed = time.perf_counter() - start
+        assert summary == baseline, "pool result differs from the inline run"
+        print(f"{f'pool x{workers}':<12}{elapsed:>10.2f}{args.paths / elapsed:>14,.0f}"
+              f"{inline_seconds / elapsed:>9.2f}  {summary['var_99']:>8.3f}")
+
+    if args.shards:
+        bench_shards(params, args.shards, baseline)
+
+
+async def run_all_shards(params: dict, shards: int, pool) -> list:
+    return [await run_shard(params, shard, shards, executor=pool) for shard in range(shards)]
+
+
+def bench_shards(params: dict, shards: int, baseline: dict):
+    with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as pool:
+        start = time.perf_counter()
+        accumulators = asyncio.run(run_all_shards(params, shards, pool))
+        elapsed = time.perf_counter() - start
+
+    merged = SimulationAccumulator()
+    for accumulator in accumulators:
+        merged.merge(SimulationAccumulator.from_dict(accumulator))
+    summary = merged.summary(QUANTILES, baseline["seed"])
+
+    payload_kb = sum(len(str(accumulator)) for accumulator in accumulators) / 1024
+    print(f"\n{shards} shards in {elapsed:.2f}s, {payload_kb:.0f} KB of accumulators; merged vs exact:")
+    std = baseline["std_pnl"]
+    fields = ["mean_pnl", "std_pnl", "var_95", "var_99", "es_95", "es_99", "barrier_probability"]
+    for field in fields:
+        print(f"  {field:<20}{baseline[field]:>12.5f}{summary[field]:>12.5f}")
+    for q in map(str, QUANTILES):
+        exact, merged_value = baseline["quantiles"][q], summary["quantiles"][q]
+        print(f"  {'q' + q:<20}{exact:>12.5f}{merged_value:>12.5f}  ({abs(merged_value - exact) / std:.4f} std)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmarks the scoring engine behind `scoring_task`: entities/sec at 1k / 100k / 1M entities for
+
+- per-entity: extract and score one entity at a time (the loop the batch engine replaces),
+- batch, no cache: one feature matrix (column-wise extraction) and one matrix product,
+- batch, cold: the same through an empty feature cache (adds the cache bookkeeping),
+- batch, rescore: the same entities again with changed weights, features served from the cache.
+
+Scores must agree across the three.
+
+    python bench_scoring.py --entities 1000 100000 1000000
+"""
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+from activities.scoring.engine import FEATURES, RISKY_PORTS, FeatureCache, resolve_model, score_entities
+
+
+def make_entities(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    ports = [22, 80, 443, 3389, 8080, 8443, 5432]
+    return [
+        {
+            "entity_id": f"e-{i}",
+            "version": 1,
+            "type": rng.choice(["domain", "ip", "certificate", "cloud"]),
+            "internet_exposed": rng.random() < 0.4,
+            "open_ports": rng.sample(ports, rng.randint(0, 3)),
+            "vulnerabilities": [{"severity": rng.choice(["critical", "high", "medium", "low"])}
+                                for _ in range(rng.randint(0, 4))],
+            "tls_expires_at": "2027-01-01" if rng.random() < 0.5 else None,
+        }
+        for i in range(count)
+    ]
+
+
+def features_of(entity: dict) -> dict:
+    features = dict.fromkeys(FEATURES, 0.0)
+    for vulnerability in entity.get("vulnerabilities") or ():
+        name = f"vulns_{str(vulnerability.get('severity', '')).lower()}"
+        if name in features:
+            features[name] += 1
+    ports = entity.get("open_ports") or ()
+    features["open_ports"] = len(ports)
+    features["risky_ports"] = sum(1 for port in ports if port in RISKY_PORTS)
+    features["internet_exposed"] = float(bool(entity.get("internet_exposed")))
+    features["has_tls"] = float(bool(entity.get("tls_expires_at")))
+    if f"type_{entity.get('type')}" in features:
+        features[f"type_{entity.get('type')}"] = 1.0
+    return features
+
+
+def score_one_by_one(entities: list, model: dict) -> list:
+    """The loop the batch engine replaces: extract and score each entity on its own."""
+    model = resolve_model(model)
+    scores = []
+    for entity in entities:
+        logit = sum(value * model["weights"][name] for name, value in features_of(entity).items()) + model["bias"]
+        scores.append(100.0 / (1.0 + math.exp(-logit)))
+    return scores
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entities", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+    reweighted = {"weights": {"risky_ports": 0.9, "internet_exposed": 1.5}}
+
+    print(f"{'entities':>9}  {'mode':<16}{'seconds':>10}{'entities/sec':>15}{'speedup':>9}")
+    for count in args.entities:
+        entities = make_entities(count)
+        cache = FeatureCache(capacity=count)
+
+        baseline, loop_seconds = timed(score_one_by_one, entities, reweighted)
+        uncached, uncached_seconds = timed(score_entities, entities, reweighted, None)
+        cold, cold_seconds = timed(score_entities, entities, None, cache)
+        rescored, rescore_seconds = timed(score_entities, entities, reweighted, cache)
+        for batch in (uncached, rescored):
+            assert np.allclose(batch["scores"], baseline, atol=1e-3), "batch scores differ from per-entity scores"
+        assert rescored["cache"]["hits"] == count
+
+        for mode, seconds in (("per-entity", loop_seconds), ("batch, no cache", uncached_seconds),
+                              ("batch, cold", cold_seconds),
+                              ("batch, rescore", rescore_seconds)):
+            print(f"{count:>9,}  {mode:<16}{seconds:>10.3f}{count / seconds:>15,.0f}{loop_seconds / seconds:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,80 @@
+import asyncio
 from datetime import timedelta
 
 from temporalio import workflow
+from temporalio.exceptions import ApplicationError
+
+with workflow.unsafe.imports_passed_through():
+    from activities.monte_carlo.params import resolve_params
+    from environment.retry_policies import retry_policy
+    from task_catalog import task_route
+
+
+def activity_options(route: dict) -> dict:
+    """execute_activity keyword arguments for a task_catalog route."""
+    return {
+        "task_queue": route["task_queue"],
+        "start_to_close_timeout": timedelta(seconds=route["start_to_close_seconds"]),
+        "heartbeat_timeout": timedelta(seconds=route["heartbeat_seconds"]) if route["heartbeat_seconds"] else None,
+        "retry_policy": retry_policy(route["retry"]),
+    }
+
+
+def task_input(task: dict):
+    """A dict task's input: its "params" or "request" (the same thing; simulations call it params)."""
+    if "params" in task and "request" in task:
+        raise ApplicationError(f"Task {task.get('task')!r} sets both params and request; use one",
+                               type="InvalidTask", non_retryable=True)
+    return task.get("params", task.get("request"))
 
 
 @workflow.defn
 class DynamicWorkflow:
     @workflow.run
     async def run(self, tasks: list) -> str:
+        """
+        Runs each task by activity name, on the task queue and with the timeouts and retry policy of its
+        resource class in task_catalog. A task can also be a dict such as
+        {"task": "monte_carlo_task", "shards": 8, "params": {...}}, which splits one simulation into shard
+        activities that any worker on the queue can pick up and merges their accumulators in one more, or
+        {"task": "easm_reporting_task", "request": {...}}; unsharded dict tasks get their "params" or
+        "request" as the second argument.
+        Dict tasks may override route keys (task_queue, start_to_close_seconds, heartbeat_seconds, retry).
+        """
         results = []
         for task in tasks:
             print(f"Workflow running the task: {task}")
-            result = await workflow.execute_activity(task, task, start_to_close_timeout=timedelta(seconds=30))
+            if isinstance(task, dict) and task.get("shards"):
+                result = await self.run_sharded_monte_carlo(task)
+            elif isinstance(task, dict):
+                result = await workflow.execute_activity(
+                    task["task"],
+                    args=[task["task"], task_input(task)],
+                    **activity_options(task_route(task["task"], task)),
+                )
+            else:
+                result = await workflow.execute_activity(task, task, **activity_options(task_route(task)))
             results.append(result)
         return f"Workflow completed with results: {results}"
 
+    async def run_sharded_monte_carlo(self, task: dict) -> dict:
+        shards = task["shards"]
+        if isinstance(shards, bool) or not isinstance(shards, int) or shards < 1:
+            raise ApplicationError(f"Task {task.get('task')!r}: shards must be a positive int, got {shards!r}",
+                                   type="InvalidTask", non_retryable=True)
+        try:
+            params = resolve_params(task_input(task))  # Pin defaults (incl. the seed) so every shard agrees
+        except ValueError as e:
+            raise ApplicationError(f"Task {task.get('task')!r}: {e}", type="InvalidTask", non_retryable=True) from e
+        options = activity_options(task_route("monte_carlo_shard", task))
+        accumulators = await asyncio.gather(*(
+            workflow.execute_activity("monte_carlo_shard", args=[params, shard, shards], **options)
+            for shard in range(shards)
+        ))
+
+        # Merged in shard order, so the summary is the same on every retry
+        summary = await workflow.execute_activity(
+            "monte_carlo_reduce", args=[list(accumulators), params["seed"]],
+            **activity_options(task_route("monte_carlo_reduce", task)),
+        )
+        return {"task": task.get("task", "monte_carlo_task"), "shards": shards, **summary}
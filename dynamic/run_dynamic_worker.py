@@ -1,42 +1,63 @@
-from temporalio import activity
-from temporalio.worker import Worker
-from temporalio.client import Client
+import argparse
 import asyncio
+import contextlib
+import os
+import time
 
-from dynamic.discovery import discover_activities
+from dynamic.activity_index import LazyActivityResolver, build_activity_index, lazy_activity
 from dynamic_workflow import DynamicWorkflow
-import activities
-# from activities import task1, task2, task3
-import inspect
-import activities  # 👈 Import the activities module dynamically
+from environment.temporal_client import connect_client
+from environment.worker_launcher import launch_worker, wait_for_shutdown
+from task_catalog import DEFAULT, RESOURCE_CLASSES
+
+
+def parse_concurrency(values: list) -> dict:
+    """["cpu=4", "io=300"] -> {"cpu": 4, "io": 300}"""
+    limits = {}
+    for value in values or ():
+        resource_class, _, limit = value.partition("=")
+        if resource_class not in RESOURCE_CLASSES or not limit.isdigit():
+            raise ValueError(f"Expected <resource class>=<max concurrent activities>, got {value!r}")
+        limits[resource_class] = int(limit)
+    return limits
 
 
 async def main():
-    client = await Client.connect("localhost:7233")
-
-    # all_activities = [
-    #     func for name, func in inspect.getmembers(activities, inspect.isfunction)
-    # ]
-    #     if inspect.isfunction(func) and hasattr(func, "_activity_definition")
-    all_activities = discover_activities(activities)
-    print(all_activities)
-
-    # all_activities = [
-    #     getattr(activities, name) for name in dir(activities)
-    # ]
-    # # if callable(getattr(activities, name)) and hasattr(getattr(activities, name), "_activity_definition")
-    # print(all_activities)
-
-    worker = Worker(
-        client,
-        task_queue="dynamic-task-queue",  # 👈 Must match workflow execution
-        workflows=[DynamicWorkflow],
-        # activities=[task1, task2, task3],  # 👈 Register all possible tasks
-        activities=all_activities
-    )
-
-    print("Worker started, listening for dynamic workflows...")
-    await worker.run()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resource-classes", nargs="+", choices=sorted(RESOURCE_CLASSES),
+                        default=os.getenv("DYNAMIC_RESOURCE_CLASSES", " ".join(RESOURCE_CLASSES)).split(),
+                        help="Resource classes whose task queues this process polls (default: all)")
+    parser.add_argument("--concurrency", nargs="*", default=[], metavar="CLASS=N",
+                        help="Override max concurrent activities per resource class, e.g. cpu=2 io=500")
+    args = parser.parse_args()
+    limits = parse_concurrency(args.concurrency)
+
+    client = await connect_client()
+
+    # 🔹 Index activity name -> module from the sources only; each module is imported the first time one of
+    # its activities runs (see dynamic.discovery for the old eager import of the whole package)
+    start = time.perf_counter()
+    activity_index = build_activity_index("activities")
+    print(f"Indexed {len(activity_index)} activities in {time.perf_counter() - start:.3f}s: {sorted(activity_index)}")
+    run_indexed_activity = lazy_activity(LazyActivityResolver(activity_index))
+
+    # One Worker per resource class, each polling its own queue with its own concurrency limit; workflows run
+    # on the default class's queue (the one the starter uses)
+    async with contextlib.AsyncExitStack() as stack:
+        for resource_class in args.resource_classes:
+            settings = RESOURCE_CLASSES[resource_class]
+            max_concurrent = limits.get(resource_class, settings["max_concurrent_activities"])
+            await stack.enter_async_context(launch_worker(
+                client,
+                task_queue=settings["task_queue"],  # 👈 Must match the route in task_catalog
+                workflows=[DynamicWorkflow] if resource_class == DEFAULT else [],
+                activities=[run_indexed_activity],  # 👈 One handler for every indexed task
+                config={"max_concurrent_activities": max_concurrent},
+            ))
+            print(f"Polling {settings['task_queue']} ({resource_class}, {max_concurrent} concurrent activities)")
+
+        print("Worker started, listening for dynamic workflows...")
+        await wait_for_shutdown()
 
 
 if __name__ == '__main__':
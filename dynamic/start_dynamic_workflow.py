@@ -1,15 +1,23 @@
-from temporalio.client import Client
 import asyncio
 import uuid
+from environment.temporal_client import connect_client
 
 
 async def main():
-    client = await Client.connect("localhost:7233")  # Connect to Temporal Server
+    client = await connect_client()  # Connect to Temporal Server
 
     # Simulating a message containing dynamic tasks
     message = {
         "workflow_id": f"dynamic-workflow-{uuid.uuid4()}",
-        "tasks": ["easm_reporting_task", "monte_carlo_task"]  # Task names coming from the message
+        "tasks": [
+            {"task": "easm_reporting_task", "request": {"inventory_path": "/data/easm/inventory.ndjson.gz"}},
+            "monte_carlo_task",  # Task names coming from the message
+            {"task": "scoring_task", "request": {"entities": [
+                {"entity_id": "a-1", "version": 3, "type": "ip", "internet_exposed": True, "open_ports": [22, 443],
+                 "vulnerabilities": [{"severity": "critical"}]},
+            ]}},
+            {"task": "monte_carlo_task", "shards": 4, "params": {"paths": 4_000_000}},  # Split across workers
+        ]
     }
 
     result = await client.start_workflow(
@@ -0,0 +1,57 @@
+"""
+Where and how each dynamic task runs.
+
+Every activity name maps to a resource class, and every resource class to its own task queue, so CPU-bound
+simulations and I/O-bound reporting are polled by different workers with different concurrency limits
+(see run_dynamic_worker.py --resource-classes). Names missing from the catalog run in the "default" class
+on the workflow's own queue, with the old 30s timeout.
+
+The catalog is code, not configuration: the workflow reads it while it runs, so changing a route is a
+deploy, like any other change to workflow code.
+"""
+import os
+
+DEFAULT = "default"
+CPU = "cpu"
+IO = "io"
+
+RESOURCE_CLASSES = {
+    DEFAULT: {"task_queue": "dynamic-task-queue", "max_concurrent_activities": 50},
+    # Simulations fan out to the worker's process pool; a few at a time keep that pool busy
+    CPU: {"task_queue": "dynamic-cpu-task-queue", "max_concurrent_activities": max(1, (os.cpu_count() or 1) // 4)},
+    IO: {"task_queue": "dynamic-io-task-queue", "max_concurrent_activities": 200},
+}
+
+DEFAULT_ROUTE = {
+    "resource_class": DEFAULT,
+    "start_to_close_seconds": 30,
+    "heartbeat_seconds": None,
+    "retry": None,  # See environment.retry_policies; None keeps Temporal's default policy
+}
+
+TASK_CATALOG = {
+    "monte_carlo_task": {"resource_class": CPU, "start_to_close_seconds": 1800, "heartbeat_seconds": 60,
+                         "retry": {"maximum_attempts": 3}},
+    "monte_carlo_shard": {"resource_class": CPU, "start_to_close_seconds": 600, "heartbeat_seconds": 60,
+                          "retry": {"maximum_attempts": 3}},
+    "monte_carlo_reduce": {"resource_class": CPU, "start_to_close_seconds": 120, "retry": {"maximum_attempts": 3}},
+    "scoring_task": {"resource_class": CPU, "start_to_close_seconds": 300, "retry": {"maximum_attempts": 3}},
+    "easm_reporting_task": {"resource_class": IO, "start_to_close_seconds": 3600, "heartbeat_seconds": 120,
+                            "retry": {"maximum_attempts": 5, "non_retryable_error_types": ["InventoryNotFound"]}},
+}
+
+_ROUTE_KEYS = set(DEFAULT_ROUTE) | {"task_queue"}
+
+
+def task_route(name: str, overrides: dict = None) -> dict:
+    """
+    Route of activity `name`: resource_class, task_queue, start_to_close_seconds, heartbeat_seconds and retry.
+
+    :param overrides: Route keys given on the task in the workflow input; other keys are ignored.
+    """
+    route = {**DEFAULT_ROUTE, **TASK_CATALOG.get(name, {})}
+    route.update({key: value for key, value in (overrides or {}).items() if key in _ROUTE_KEYS})
+    if route["resource_class"] not in RESOURCE_CLASSES:
+        raise ValueError(f"Unknown resource class {route['resource_class']!r} for task {name}")
+    route.setdefault("task_queue", RESOURCE_CLASSES[route["resource_class"]]["task_queue"])
+    return route
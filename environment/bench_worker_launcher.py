@@ -0,0 +1,125 @@
+"""
+Benchmarks activity throughput (activities/sec) for each executor choice of `launch_worker`:
+
+- I/O wait: `await asyncio.sleep` (async) vs `time.sleep` in an async def (blocks the event loop, the old
+  pc_activities bug) vs `time.sleep` in a sync def (thread pool).
+- CPU work: pure-Python loop in a sync def on the thread pool (serialised by the GIL) vs `@cpu_bound` on
+  the process pool.
+
+Each mode runs one workflow that starts --activities activities at once. Needs a Temporal server: the one
+at TEMPORAL_ADDRESS, or an ephemeral dev server with --dev-server. Run from the repository root:
+
+    python -m environment.bench_worker_launcher --activities 200 --io-seconds 0.1 --cpu-iterations 2000000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import timedelta
+
+from temporalio import activity, workflow
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import UnsandboxedWorkflowRunner
+
+from environment.temporal_client import connect_client
+from environment.worker_launcher import cpu_bound, launch_worker
+
+
+@activity.defn
+async def async_wait(seconds: float) -> float:
+    await asyncio.sleep(seconds)
+    return seconds
+
+
+@activity.defn
+async def blocking_wait_in_async(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+@activity.defn
+def thread_wait(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def burn(iterations: int) -> int:
+    total = 0
+    for i in range(iterations):
+        total += i * i % 7
+    return total
+
+
+@activity.defn
+def cpu_in_thread(iterations: int) -> int:
+    return burn(iterations)
+
+
+@cpu_bound
+@activity.defn
+def cpu_in_process(iterations: int) -> int:
+    return burn(iterations)
+
+
+@workflow.defn
+class FanOutBenchWorkflow:
+    @workflow.run
+    async def run(self, activity_name: str, count: int, arg) -> int:
+        await asyncio.gather(*(
+            workflow.execute_activity(activity_name, arg, start_to_close_timeout=timedelta(minutes=10))
+            for _ in range(count)
+        ))
+        return count
+
+
+async def bench(client, activities: int, io_seconds: float, cpu_iterations: int, config: dict):
+    task_queue = f"bench-worker-launcher-{uuid.uuid4()}"
+    modes = [
+        ("I/O", "async", async_wait, io_seconds),
+        ("I/O", "async, blocking", blocking_wait_in_async, io_seconds),
+        ("I/O", "thread", thread_wait, io_seconds),
+        ("CPU", "thread", cpu_in_thread, cpu_iterations),
+        ("CPU", "process", cpu_in_process, cpu_iterations),
+    ]
+    async with launch_worker(
+        client,
+        task_queue,
+        workflows=[FanOutBenchWorkflow],
+        activities=[fn for _, _, fn, _ in modes],
+        config=config,
+        workflow_runner=UnsandboxedWorkflowRunner(),  # The workflow lives in this script
+    ):
+        print(f"{'work':<6}{'executor':<18}{'seconds':>10}{'activities/sec':>16}")
+        for work, executor, fn, arg in modes:
+            start = time.perf_counter()
+            await client.execute_workflow(
+                FanOutBenchWorkflow.run,
+                args=[fn.__temporal_activity_definition.name, activities, arg],
+                id=f"bench-{fn.__name__}-{uuid.uuid4()}",
+                task_queue=task_queue,
+            )
+            elapsed = time.perf_counter() - start
+            print(f"{work:<6}{executor:<18}{elapsed:>10.2f}{activities / elapsed:>16,.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--activities", type=int, default=200)
+    parser.add_argument("--io-seconds", type=float, default=0.1)
+    parser.add_argument("--cpu-iterations", type=int, default=2_000_000)
+    parser.add_argument("--max-concurrent-activities", type=int, default=100)
+    parser.add_argument("--activity-processes", type=int, default=None)
+    parser.add_argument("--dev-server", action="store_true", help="Start an ephemeral local Temporal server")
+    args = parser.parse_args()
+    config = {"max_concurrent_activities": args.max_concurrent_activities,
+              "activity_processes": args.activity_processes}
+
+    if args.dev_server:
+        async with await WorkflowEnvironment.start_local() as env:
+            await bench(env.client, args.activities, args.io_seconds, args.cpu_iterations, config)
+    else:
+        await bench(await connect_client(), args.activities, args.io_seconds, args.cpu_iterations, config)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
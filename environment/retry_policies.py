@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from temporalio.common import RetryPolicy
+
+
+def retry_policy(settings: dict = None):
+    """
+    RetryPolicy from a JSON-friendly dict (intervals in seconds); None keeps Temporal's default policy.
+
+    Keys: initial_interval_seconds, backoff_coefficient, maximum_interval_seconds, maximum_attempts (0 means
+    unlimited) and non_retryable_error_types. Used for task phases (tasks/phases.py) and dynamic task routes
+    (dynamic/task_catalog.py).
+    """
+    if not settings:
+        return None
+    return RetryPolicy(
+        initial_interval=timedelta(seconds=settings.get("initial_interval_seconds", 1)),
+        backoff_coefficient=settings.get("backoff_coefficient", 2.0),
+        maximum_interval=(timedelta(seconds=settings["maximum_interval_seconds"])
+                          if "maximum_interval_seconds" in settings else None),
+        maximum_attempts=settings.get("maximum_attempts", 0),
+        non_retryable_error_types=settings.get("non_retryable_error_types"),
+    )
@@ -0,0 +1,36 @@
+import os
+
+from temporalio.client import Client
+from temporalio.runtime import PrometheusConfig, Runtime, TelemetryConfig
+
+from converters.claim_check import BlobStore
+from converters.data_converter import build_data_converter
+
+
+_runtime = None
+
+
+def metrics_runtime():
+    """
+    Runtime exporting SDK metrics (worker slots, poll/schedule latencies, ...) in Prometheus format on
+    TEMPORAL_METRICS_PORT; None (the default runtime, no export) when it is unset.
+    """
+    global _runtime
+    port = os.getenv("TEMPORAL_METRICS_PORT")
+    if port and _runtime is None:
+        _runtime = Runtime(telemetry=TelemetryConfig(metrics=PrometheusConfig(bind_address=f"127.0.0.1:{port}")))
+    return _runtime
+
+
+async def connect_client(target_host: str = None, blob_store: BlobStore = None) -> Client:
+    """
+    Connects to Temporal with the repo-wide data converter (Arrow DataFrames, claim checks, zstd).
+
+    :param blob_store: Enables claim checks with this store, for workers built around `ClaimCheck` references
+        (see converters.claim_check); without one every payload stays inline.
+    """
+    return await Client.connect(
+        target_host or os.getenv("TEMPORAL_ADDRESS", "localhost:7233"),
+        data_converter=build_data_converter(blob_store),
+        runtime=metrics_runtime(),
+    )
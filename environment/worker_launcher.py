@@ -0,0 +1,142 @@
+"""
+One way to start a Temporal worker, with the executor each activity needs:
+
+- async: `async def` activities run on the worker's event loop; they must never block it.
+- thread: plain `def` activities (blocking I/O, C extensions that release the GIL) run on a thread pool.
+- process: `def` activities marked with `@cpu_bound` (pure-Python CPU work) run on a process pool, so they
+  scale past the GIL. They must be module-level functions with picklable arguments and results, and cannot
+  heartbeat or be cancelled once started.
+
+Concurrency and sticky-cache limits come from `worker_config()` (TEMPORAL_* env vars, then overrides).
+On SIGTERM or SIGINT the worker stops polling and gives in-flight activities `graceful_shutdown_seconds`
+to finish before they are cancelled:
+
+    async with launch_worker(client, "my-task-queue", workflows=[MyWorkflow], activities=[a, b, c]):
+        await wait_for_shutdown()
+"""
+import asyncio
+import contextlib
+import functools
+import inspect
+import multiprocessing
+import os
+import signal
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from temporalio import activity
+from temporalio.worker import Worker
+
+ASYNC = "async"
+THREAD = "thread"
+PROCESS = "process"
+
+DEFAULT_WORKER_CONFIG = {
+    "max_concurrent_activities": 100,
+    "max_concurrent_workflow_tasks": 100,
+    "max_cached_workflows": 1000,  # Sticky cache: workflows kept in memory between tasks
+    "activity_threads": None,  # Default: max_concurrent_activities, so no thread-bound activity ever queues
+    "activity_processes": None,  # Default: one per core
+    "graceful_shutdown_seconds": 60,  # How long in-flight activities may run on after a shutdown signal
+}
+
+_ENV_VARS = {
+    "max_concurrent_activities": "TEMPORAL_MAX_CONCURRENT_ACTIVITIES",
+    "max_concurrent_workflow_tasks": "TEMPORAL_MAX_CONCURRENT_WORKFLOW_TASKS",
+    "max_cached_workflows": "TEMPORAL_MAX_CACHED_WORKFLOWS",
+    "activity_threads": "TEMPORAL_ACTIVITY_THREADS",
+    "activity_processes": "TEMPORAL_ACTIVITY_PROCESSES",
+    "graceful_shutdown_seconds": "TEMPORAL_GRACEFUL_SHUTDOWN_SECONDS",
+}
+
+
+def worker_config(overrides: dict = None) -> dict:
+    """DEFAULT_WORKER_CONFIG, then TEMPORAL_* env vars, then `overrides`."""
+    unknown = set(overrides or {}) - set(DEFAULT_WORKER_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown worker settings: {sorted(unknown)}")
+    config = dict(DEFAULT_WORKER_CONFIG)
+    config.update({key: int(os.environ[var]) for key, var in _ENV_VARS.items() if os.getenv(var)})
+    config.update(overrides or {})
+    return config
+
+
+def cpu_bound(fn):
+    """Marks a sync activity to run on the worker's process pool instead of its thread pool."""
+    fn.__worker_executor__ = PROCESS
+    return fn
+
+
+def executor_kind(fn) -> str:
+    if inspect.iscoroutinefunction(fn):
+        return ASYNC
+    return getattr(fn, "__worker_executor__", THREAD)
+
+
+def group_activities(activities) -> dict:
+    groups = {ASYNC: [], THREAD: [], PROCESS: []}
+    for fn in activities:
+        groups[executor_kind(fn)].append(fn)
+    return groups
+
+
+def in_process_pool(fn, pool: ProcessPoolExecutor):
+    """Async activity with `fn`'s name and signature that awaits `fn` on the process pool."""
+    name = getattr(fn, "__temporal_activity_definition").name
+
+    @functools.wraps(fn, updated=())  # Signature and annotations only, not fn's activity definition
+    async def run_in_pool(*args):
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+    return activity.defn(name=name)(run_in_pool)
+
+
+@contextlib.asynccontextmanager
+async def launch_worker(client, task_queue: str, workflows=(), activities=(), config: dict = None, **worker_kwargs):
+    """
+    Runs a Worker for `task_queue` until the block exits, with a thread pool and/or a process pool when
+    some activities need them; the pools are shut down after the worker.
+
+    :param worker_kwargs: Passed to Worker as-is (e.g. workflow_runner, interceptors).
+    """
+    config = worker_config(config)
+    groups = group_activities(activities)
+
+    thread_pool = ThreadPoolExecutor(config["activity_threads"] or config["max_concurrent_activities"],
+                                     thread_name_prefix=f"{task_queue}-activity") if groups[THREAD] else None
+    # "spawn" so children never inherit the worker's runtime threads through fork
+    process_pool = ProcessPoolExecutor(config["activity_processes"] or os.cpu_count() or 1,
+                                       mp_context=multiprocessing.get_context("spawn")) if groups[PROCESS] else None
+    try:
+        worker = Worker(
+            client,
+            task_queue=task_queue,
+            workflows=list(workflows),
+            activities=[*groups[ASYNC], *groups[THREAD],
+                        *(in_process_pool(fn, process_pool) for fn in groups[PROCESS])],
+            activity_executor=thread_pool,
+            max_concurrent_activities=config["max_concurrent_activities"],
+            max_concurrent_workflow_tasks=config["max_concurrent_workflow_tasks"],
+            max_cached_workflows=config["max_cached_workflows"],
+            graceful_shutdown_timeout=timedelta(seconds=config["graceful_shutdown_seconds"]),
+            **worker_kwargs,
+        )
+        async with worker:
+            yield worker
+    finally:
+        for pool in (thread_pool, process_pool):
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+
+async def wait_for_shutdown():
+    """Returns on the first SIGTERM or SIGINT; leaving `launch_worker` then drains the worker."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.remove_signal_handler(sig)
@@ -0,0 +1,198 @@
+"""
+Runs N copies of a worker command on one host, so workflow tasks and Python activities use more than the
+one core a single process gets under the GIL. The copies poll the same task queues with the same config;
+Temporal spreads tasks across them.
+
+    python -m environment.worker_supervisor --processes 8 --metrics-port 9000 -- python dynamic/run_dynamic_worker.py
+
+- Each child gets WORKER_PROCESS_INDEX / WORKER_PROCESS_COUNT and, with --metrics-port, its own
+  TEMPORAL_METRICS_PORT (metrics-port + 1 + index; see environment.temporal_client.metrics_runtime).
+- A child that exits is restarted with exponential backoff (reset once it has stayed up for a minute).
+- SIGTERM / SIGINT are forwarded to every child, which drains (launch_worker's graceful shutdown: no new
+  tasks, in-flight activities finish). Children still running after --drain-seconds are killed.
+- GET /metrics on --metrics-port serves every child's metrics with a worker_process label, plus the
+  supervisor's own restart and liveness gauges; sum() over worker_process gives host totals.
+
+Process pools inside the children (MC_WORKERS, TEMPORAL_ACTIVITY_PROCESSES) default to one process per
+core each: size them for N children.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import sys
+import time
+import urllib.request
+
+INITIAL_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 30.0
+HEALTHY_AFTER_SECONDS = 60.0
+
+
+def label_samples(text: str, process: int, families: dict):
+    """
+    Adds worker_process="<process>" to every sample of one Prometheus text exposition and files the lines
+    under their metric family in `families` (name -> {"meta": [...], "samples": [...]}), so the combined
+    output keeps each family's samples together as the format requires.
+    """
+    current = None
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if line.startswith("#"):
+            parts = line.split(None, 3)
+            if len(parts) >= 3 and parts[1] in ("HELP", "TYPE"):
+                current = parts[2]
+                meta = families.setdefault(current, {"meta": [], "samples": []})["meta"]
+                if line not in meta:
+                    meta.append(line)
+            continue
+
+        name_end = min((i for i in (line.find("{"), line.find(" ")) if i >= 0), default=len(line))
+        name, rest = line[:name_end], line[name_end:]
+        label = f'worker_process="{process}"'
+        if rest.startswith("{}"):
+            sample = f"{name}{{{label}}}{rest[2:]}"
+        elif rest.startswith("{"):
+            sample = f"{name}{{{label},{rest[1:]}"
+        else:
+            sample = f"{name}{{{label}}}{rest}"
+        # Histogram and summary samples (_bucket, _sum, _count) belong to the family declared above them
+        family = current if current and (name == current or name.startswith(f"{current}_")) else name
+        families.setdefault(family, {"meta": [], "samples": []})["samples"].append(sample)
+
+
+class WorkerSupervisor:
+    def __init__(self, command: list, processes: int, metrics_port: int = None, drain_seconds: float = 90.0):
+        self.command = command
+        self.processes = processes
+        self.metrics_port = metrics_port
+        self.drain_seconds = drain_seconds
+        self.children = [None] * processes
+        self.restarts = [0] * processes
+        self.stopping = asyncio.Event()
+
+    def child_env(self, index: int) -> dict:
+        env = {**os.environ, "WORKER_PROCESS_INDEX": str(index), "WORKER_PROCESS_COUNT": str(self.processes)}
+        if self.metrics_port:
+            env["TEMPORAL_METRICS_PORT"] = str(self.metrics_port + 1 + index)
+        return env
+
+    async def supervise(self, index: int):
+        """Keeps child `index` running until shutdown."""
+        backoff = INITIAL_BACKOFF_SECONDS
+        while not self.stopping.is_set():
+            started = time.monotonic()
+            child = await asyncio.create_subprocess_exec(*self.command, env=self.child_env(index))
+            self.children[index] = child
+            print(f"[supervisor] worker {index} started (pid {child.pid})", flush=True)
+            if self.stopping.is_set():
+                child.send_signal(signal.SIGTERM)  # Spawned while the stop request was being handled
+            returncode = await child.wait()
+            if self.stopping.is_set():
+                print(f"[supervisor] worker {index} stopped (exit {returncode})", flush=True)
+                return
+
+            backoff = INITIAL_BACKOFF_SECONDS if time.monotonic() - started > HEALTHY_AFTER_SECONDS else backoff
+            self.restarts[index] += 1
+            print(f"[supervisor] worker {index} exited with {returncode}; restarting in {backoff:.0f}s", flush=True)
+            try:
+                await asyncio.wait_for(self.stopping.wait(), backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+
+    def request_stop(self, sig: signal.Signals):
+        if self.stopping.is_set():
+            return
+        print(f"[supervisor] {sig.name}: draining {self.processes} workers", flush=True)
+        self.stopping.set()
+        for child in self.children:
+            if child is not None and child.returncode is None:
+                child.send_signal(signal.SIGTERM)
+
+    def metrics_text(self) -> str:
+        """Combined exposition: every child's metrics labelled by worker_process, then the supervisor's own."""
+        families = {}
+        for index in range(self.processes):
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.metrics_port + 1 + index}/metrics",
+                                            timeout=2) as response:
+                    label_samples(response.read().decode(), index, families)
+            except OSError:
+                pass  # Child restarting or not serving metrics yet: its samples are missing from this scrape
+        lines = []
+        for family in families.values():
+            lines.extend(family["meta"])
+            lines.extend(family["samples"])
+
+        lines.append("# TYPE worker_supervisor_restarts_total counter")
+        lines.extend(f'worker_supervisor_restarts_total{{worker_process="{i}"}} {count}'
+                     for i, count in enumerate(self.restarts))
+        lines.append("# TYPE worker_supervisor_process_up gauge")
+        lines.extend(f'worker_supervisor_process_up{{worker_process="{i}"}} '
+                     f'{int(child is not None and child.returncode is None)}'
+                     for i, child in enumerate(self.children))
+        return "\n".join(lines) + "\n"
+
+    async def serve_metrics(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode(errors="replace")
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # Skip the headers
+            if request_line.split(" ")[1:2] == ["/metrics"]:
+                body = (await asyncio.to_thread(self.metrics_text)).encode()
+                status = "200 OK"
+            else:
+                body, status = b"Not found\n", "404 Not Found"
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def run(self) -> int:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.request_stop, sig)
+
+        server = None
+        if self.metrics_port:
+            server = await asyncio.start_server(self.serve_metrics, "0.0.0.0", self.metrics_port)
+            print(f"[supervisor] combined metrics on :{self.metrics_port}/metrics", flush=True)
+
+        tasks = [asyncio.create_task(self.supervise(index)) for index in range(self.processes)]
+        await self.stopping.wait()
+        _, pending = await asyncio.wait(tasks, timeout=self.drain_seconds)
+        for child in self.children:
+            if child is not None and child.returncode is None:
+                print(f"[supervisor] worker pid {child.pid} still running after {self.drain_seconds:.0f}s; killing",
+                      flush=True)
+                child.kill()
+        if pending:
+            await asyncio.wait(pending)
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(usage="%(prog)s [options] -- <worker command>")
+    parser.add_argument("--processes", type=int, default=int(os.getenv("WORKER_PROCESSES", os.cpu_count() or 1)))
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Serve combined metrics here; children export on the following ports")
+    parser.add_argument("--drain-seconds", type=float, default=90.0,
+                        help="Kill children still draining after this long (keep above their graceful shutdown)")
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        parser.error("missing worker command, e.g. -- python dynamic/run_dynamic_worker.py")
+
+    supervisor = WorkerSupervisor(command, args.processes, args.metrics_port, args.drain_seconds)
+    sys.exit(asyncio.run(supervisor.run()))
+
+
+if __name__ == '__main__':
+    main()
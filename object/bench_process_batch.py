@@ -0,0 +1,68 @@
+"""
+Benchmarks ObjectActivityWorkflow throughput (items/sec) with one activity per item vs. `process_batch`
+at fixed batch sizes 1/10/100/1000 and with automatic sizing.
+
+Needs a Temporal server: the one at TEMPORAL_ADDRESS, or an ephemeral dev server with --dev-server.
+Run from the repository root:
+
+    python -m object.bench_process_batch --items 5000 --window 100
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from environment.temporal_client import connect_client
+from object.object_activity_workflow import ObjectActivityWorkflow
+from object.task_processor import TaskProcessor
+
+
+async def bench(client, items: int, window: int, batch_sizes: list):
+    task_queue = f"bench-process-batch-{uuid.uuid4()}"
+    task_processor = TaskProcessor(prefix="Bench")
+    data_list = [f"task{i}" for i in range(items)]
+
+    modes = {"per-item": {"window": window}}
+    modes.update({f"batch={size}": {"window": window, "batch_size": size} for size in batch_sizes})
+    modes["batch=auto"] = {"window": window, "batch_size": "auto"}
+
+    async with Worker(
+        client,
+        task_queue=task_queue,
+        workflows=[ObjectActivityWorkflow],
+        activities=[task_processor.process, task_processor.process_batch],
+        max_concurrent_activities=window,
+    ):
+        print(f"{'items':>7}  {'mode':<12}{'seconds':>10}{'items/sec':>12}")
+        for mode, options in modes.items():
+            start = time.perf_counter()
+            await client.execute_workflow(
+                ObjectActivityWorkflow.run,
+                args=[data_list, {**options, "aggregate": "counts", "shard_size": items}],
+                id=f"bench-{mode}-{uuid.uuid4()}",
+                task_queue=task_queue,
+            )
+            elapsed = time.perf_counter() - start
+            print(f"{items:>7}  {mode:<12}{elapsed:>10.2f}{items / elapsed:>12,.0f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=5_000)
+    parser.add_argument("--window", type=int, default=100)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--dev-server", action="store_true", help="Start an ephemeral local Temporal server")
+    args = parser.parse_args()
+
+    if args.dev_server:
+        async with await WorkflowEnvironment.start_local() as env:
+            await bench(env.client, args.items, args.window, args.batch_sizes)
+    else:
+        await bench(await connect_client(), args.items, args.window, args.batch_sizes)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,152 @@
+import asyncio
+
+# Aggregation modes for ObjectActivityWorkflow results
+ORDERED_LIST = "list"  # Every result, in input order; stored outside history past max_inline_results
+COUNTS = "counts"  # Success/failure counts plus the first failures: constant size whatever the input size
+DEFAULT_AGGREGATE = ORDERED_LIST
+DEFAULT_MAX_INLINE_RESULTS = 10_000
+
+MAX_LISTED_FAILURES = 20
+
+
+def shard_ranges(count: int, shard_size: int) -> list:
+    """Contiguous [start, stop) ranges covering `count` items, so shard results concatenate in input order."""
+    return [(start, min(start + shard_size, count)) for start in range(0, count, shard_size)]
+
+
+class ResultAggregate:
+    """Folds results into the workflow result as they arrive, in any order, without keeping more than needed."""
+
+    def __init__(self, mode: str = DEFAULT_AGGREGATE, count: int = 0, stored: bool = False):
+        """
+        :param stored: In "list" mode, collect child shards' stored-result references (in input order)
+            instead of their results.
+        """
+        if mode not in (ORDERED_LIST, COUNTS):
+            raise ValueError(f"Unknown aggregation mode {mode!r}")
+        self.mode = mode
+        self.stored = stored and mode == ORDERED_LIST
+        self.succeeded = 0
+        self.failures = []
+        self.failed = 0
+        self.results = [None] * count if mode == ORDERED_LIST and not self.stored else None
+        self.result_refs = []
+
+    def add(self, index: int, result):
+        self.succeeded += 1
+        if self.results is not None:
+            self.results[index] = result
+
+    def add_failure(self, index: int, error: str):
+        self.failed += 1
+        if len(self.failures) < MAX_LISTED_FAILURES:
+            self.failures.append({"index": index, "error": error})
+
+    def add_shard_failure(self, start: int, stop: int, error: str):
+        """Counts every item of a child shard that failed as a whole (no per-item results came back)."""
+        self.failed += stop - start
+        if len(self.failures) < MAX_LISTED_FAILURES:
+            self.failures.append({"index": start, "error": f"Shard of items {start}-{stop - 1} failed: {error}"})
+
+    def merge(self, offset: int, shard_result):
+        """Adds a child shard's result (from `to_result()`) whose items start at `offset`."""
+        if self.stored:
+            self.result_refs.extend({**ref, "start": ref["start"] + offset} for ref in shard_result["result_refs"])
+            self.succeeded += shard_result["count"]
+            return
+        if self.mode == ORDERED_LIST:
+            self.results[offset:offset + len(shard_result)] = shard_result
+            self.succeeded += len(shard_result)
+            return
+        self.succeeded += shard_result["succeeded"]
+        self.failed += shard_result["failed"]
+        for failure in shard_result["failures"]:
+            if len(self.failures) < MAX_LISTED_FAILURES:
+                self.failures.append({"index": failure["index"] + offset, "error": failure["error"]})
+
+    def to_result(self):
+        if self.stored:
+            return {"count": self.succeeded, "result_refs": sorted(self.result_refs, key=lambda ref: ref["start"])}
+        if self.mode == ORDERED_LIST:
+            return self.results
+        return {"count": self.succeeded + self.failed, "succeeded": self.succeeded, "failed": self.failed,
+                "failures": self.failures}
+
+
+async def run_windowed(start_next, on_done, window: int):
+    """
+    Keeps at most `window` units of work in flight, starting the next one as soon as any finishes.
+
+    :param start_next: `() -> (key, awaitable)` for the next unit of work, or None once there is none left.
+    :param on_done: `(key, task)` called for each finished unit, in completion order.
+
+    Uses only asyncio primitives the workflow event loop replays deterministically.
+    """
+    running = {}
+    order = {}
+    exhausted = False
+    while not exhausted or running:
+        while not exhausted and len(running) < window:
+            unit = start_next()
+            if unit is None:
+                exhausted = True
+                break
+            key, awaitable = unit
+            task = asyncio.ensure_future(awaitable)
+            running[task] = key
+            order[task] = len(order)
+        if not running:
+            break
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for task in sorted(done, key=order.get):
+            try:
+                on_done(running.pop(task), task)
+            except BaseException:
+                for other in running:
+                    other.cancel()
+                raise
+
+
+def counter(count: int, start_item):
+    """`start_next` for `run_windowed` over indexes 0..count-1."""
+    indexes = iter(range(count))
+
+    def start_next():
+        index = next(indexes, None)
+        return None if index is None else (index, start_item(index))
+
+    return start_next
+
+
+class BatchSizer:
+    """
+    Picks the next batch size from observed per-item latency, aiming for batches of about `target_seconds`
+    so per-activity overhead is amortized without making any single activity (or its retry) too long.
+    """
+
+    def __init__(self, initial: int = 10, min_size: int = 1, max_size: int = 1000, target_seconds: float = 1.0,
+                 smoothing: float = 0.3):
+        self.size = initial
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.smoothing = smoothing
+        self.per_item_seconds = None  # Exponentially weighted moving average
+
+    def next_size(self) -> int:
+        return self.size
+
+    def observe(self, items: int, elapsed_seconds: float):
+        if items <= 0:
+            return
+        latency = elapsed_seconds / items
+        if self.per_item_seconds is None:
+            self.per_item_seconds = latency
+        else:
+            self.per_item_seconds += self.smoothing * (latency - self.per_item_seconds)
+        if self.per_item_seconds <= 0:
+            ideal = self.max_size
+        else:
+            ideal = int(self.target_seconds / self.per_item_seconds)
+        # Grow at most 4x per observation so one fast outlier can't produce a giant batch
+        self.size = max(self.min_size, min(self.max_size, ideal, self.size * 4))
@@ -2,25 +2,147 @@ import asyncio
 from datetime import timedelta
 
 from temporalio import workflow
+from temporalio.exceptions import ApplicationError
 
+from object.fan_out import DEFAULT_AGGREGATE, DEFAULT_MAX_INLINE_RESULTS, ORDERED_LIST, BatchSizer, ResultAggregate, counter, run_windowed, \
+    shard_ranges
 from object.task_processor import TaskProcessor
 
+DEFAULT_WINDOW = 100
+DEFAULT_SHARD_SIZE = 2_000
+DEFAULT_MAX_CONCURRENT_SHARDS = 10
+DEFAULT_BATCH_TIMEOUT_SECONDS = 300
+
 
 @workflow.defn
 class ObjectActivityWorkflow:
     @workflow.run
-    async def run(self, data_list: list) -> list:
-        activity_futures = []
+    async def run(self, data_list: list, options: dict = None):
+        """
+        Processes every element of `data_list` with `TaskProcessor.process`.
+
+        At most `window` activities are in flight at once; each finished one frees a slot for the next, so
+        the schedule stays smooth instead of bursting the whole list onto the task queue. Lists longer than
+        `shard_size` are split into contiguous child workflows (at most `max_concurrent_shards` at a time),
+        which keeps every history bounded.
+
+        :param options: Optional settings: window, shard_size, max_concurrent_shards and aggregate ("list",
+            the default: every result in input order, failing on the first failure; "counts": compact
+            success/failure summary that also tolerates failed elements and failed shards). "list" results of
+            more than max_inline_results elements (default 10,000) are written to the object result store, and
+            the workflow returns a compact {"count", "result_refs"} reference instead (read it in order with
+            `object.result_store.read_results`). With batch_size
+            (an int, or "auto" to size batches from the observed per-item latency) elements go through
+            `TaskProcessor.process_batch` instead, and the window counts batches; batch_target_seconds /
+            batch_max_size tune "auto".
+        """
+        options = options or {}
+        shard_size = options.get("shard_size", DEFAULT_SHARD_SIZE)
+        # Too many results for history: shards store theirs and hand back references (see store_results)
+        store_results = options.get("aggregate", DEFAULT_AGGREGATE) == ORDERED_LIST and (
+            options.get("store_results")
+            or len(data_list) > options.get("max_inline_results", DEFAULT_MAX_INLINE_RESULTS))
+        sharded = len(data_list) > shard_size
+        aggregate = ResultAggregate(options.get("aggregate", DEFAULT_AGGREGATE), len(data_list),
+                                    stored=store_results and sharded)
+
+        if sharded:
+            await self.run_shards(data_list, {**options, "store_results": store_results}, aggregate)
+        elif options.get("batch_size"):
+            await self.run_batches(data_list, options, aggregate)
+        else:
+            await self.run_window(data_list, options, aggregate)
+        if store_results and not sharded:
+            return await self.store_results(aggregate.to_result())
+        return aggregate.to_result()
 
-        for data in data_list:
-            # Call the activity method with workflow.execute_activity
-            future = workflow.execute_activity(
+    @staticmethod
+    async def store_results(results: list) -> dict:
+        # Ordered results go to the object result store; only the reference is returned
+        return await workflow.execute_activity(
+            "store_object_results",
+            args=[workflow.info().workflow_id, results],
+            start_to_close_timeout=timedelta(seconds=60),
+        )
+
+    async def run_window(self, data_list: list, options: dict, aggregate: ResultAggregate):
+        def start_item(index):
+            return workflow.execute_activity(
                 TaskProcessor.process,  # Call the method
-                data,  # Pass data to the activity
+                data_list[index],  # Pass data to the activity
                 start_to_close_timeout=timedelta(seconds=60)
             )
-            activity_futures.append(future)
 
-        # Wait for all activities to complete
-        results = await asyncio.gather(*activity_futures)
-        return results
+        def on_done(index, task):
+            if aggregate.mode == ORDERED_LIST:
+                aggregate.add(index, task.result())  # Any failure fails the workflow, as before
+            elif task.exception() is not None:
+                aggregate.add_failure(index, str(task.exception()))
+            else:
+                aggregate.add(index, task.result())
+
+        await run_windowed(counter(len(data_list), start_item), on_done, options.get("window", DEFAULT_WINDOW))
+
+    async def run_batches(self, data_list: list, options: dict, aggregate: ResultAggregate):
+        batch_size = options["batch_size"]
+        if batch_size == "auto":
+            # Batch timings come back in activity results, so the sizing replays deterministically
+            sizer = BatchSizer(max_size=options.get("batch_max_size", 1000),
+                               target_seconds=options.get("batch_target_seconds", 1.0))
+        else:
+            sizer = BatchSizer(initial=batch_size, min_size=batch_size, max_size=batch_size)
+        next_start = 0
+
+        def start_next():
+            nonlocal next_start
+            if next_start >= len(data_list):
+                return None
+            start, next_start = next_start, min(next_start + sizer.next_size(), len(data_list))
+            return (start, next_start), workflow.execute_activity(
+                TaskProcessor.process_batch,
+                data_list[start:next_start],
+                start_to_close_timeout=timedelta(seconds=options.get("batch_timeout_seconds",
+                                                                     DEFAULT_BATCH_TIMEOUT_SECONDS)),
+            )
+
+        def on_done(batch, task):
+            start, stop = batch
+            error = task.exception()
+            if error is not None and aggregate.mode != ORDERED_LIST:
+                # The whole batch activity failed (retries exhausted, timeout): all of its items count as failed
+                aggregate.add_shard_failure(start, stop, str(error.__cause__ or error))
+                return
+            response = task.result()  # A failed batch fails a "list" workflow
+            sizer.observe(len(response["results"]), response["elapsed_seconds"])
+            for offset, item in enumerate(response["results"]):
+                if item["ok"]:
+                    aggregate.add(start + offset, item["result"])
+                elif aggregate.mode == ORDERED_LIST:
+                    raise ApplicationError(f"Item {start + offset} failed: {item['error']}", non_retryable=True)
+                else:
+                    aggregate.add_failure(start + offset, item["error"])
+
+        await run_windowed(start_next, on_done, options.get("window", DEFAULT_WINDOW))
+
+    async def run_shards(self, data_list: list, options: dict, aggregate: ResultAggregate):
+        workflow_id = workflow.info().workflow_id
+        ranges = shard_ranges(len(data_list), options.get("shard_size", DEFAULT_SHARD_SIZE))
+
+        def start_shard(shard):
+            start, stop = ranges[shard]
+            return workflow.execute_child_workflow(
+                ObjectActivityWorkflow.run,
+                args=[data_list[start:stop], options],
+                id=f"{workflow_id}-shard-{shard}",
+            )
+
+        def on_done(shard, task):
+            start, stop = ranges[shard]
+            error = task.exception()
+            if error is not None and aggregate.mode != ORDERED_LIST:
+                aggregate.add_shard_failure(start, stop, str(error.__cause__ or error))
+                return
+            aggregate.merge(start, task.result())  # A failed shard fails a "list" workflow
+
+        await run_windowed(counter(len(ranges), start_shard), on_done,
+                           options.get("max_concurrent_shards", DEFAULT_MAX_CONCURRENT_SHARDS))
@@ -0,0 +1,50 @@
+import asyncio
+import json
+import os
+
+from temporalio import activity
+
+from converters.claim_check import BlobStore, LocalBlobStore, S3BlobStore
+
+
+def result_store_from_env() -> BlobStore:
+    """Builds the fan-out result store from OBJECT_RESULTS_STORE (local|s3), OBJECT_RESULTS_PATH and OBJECT_RESULTS_BUCKET."""
+    if os.getenv("OBJECT_RESULTS_STORE", "local").lower() == "s3":
+        return S3BlobStore(os.environ["OBJECT_RESULTS_BUCKET"], os.getenv("OBJECT_RESULTS_PREFIX", "object-results/"))
+    return LocalBlobStore(os.getenv("OBJECT_RESULTS_PATH", "/tmp/temporal-object-results"))
+
+
+_result_store = None
+
+
+def get_result_store() -> BlobStore:
+    global _result_store
+    if _result_store is None:
+        _result_store = result_store_from_env()
+    return _result_store
+
+
+def results_key(workflow_id: str) -> str:
+    return f"{workflow_id}.results.json"
+
+
+@activity.defn(name="store_object_results")
+async def store_object_results(workflow_id: str, results: list) -> dict:
+    """
+    Stores a workflow's ordered results outside history and returns the compact reference that replaces them.
+
+    Keyed by workflow id, so a retried activity overwrites its own blob.
+    """
+    key = results_key(workflow_id)
+    await asyncio.to_thread(get_result_store().put, key, json.dumps(results, default=str).encode())
+    return {"count": len(results), "result_refs": [{"key": key, "start": 0, "count": len(results)}]}
+
+
+def read_results(result, store: BlobStore = None):
+    """Yields an ObjectActivityWorkflow "list" result in input order, whether inline or stored."""
+    if isinstance(result, list):
+        yield from result
+        return
+    store = store or get_result_store()
+    for ref in result["result_refs"]:
+        yield from json.loads(store.get(ref["key"]))
@@ -1,3 +1,5 @@
+import time
+
 from temporalio import activity
 
 
@@ -5,6 +7,27 @@ class TaskProcessor:
     def __init__(self, prefix):
         self.prefix = prefix
 
+    def _process_item(self, data: str) -> str:
+        return f"{self.prefix}: Processed {data}"
+
     @activity.defn
     async def process(self, data: str) -> str:
-        return f"{self.prefix}: Processed {data}"
+        return self._process_item(data)
+
+    @activity.defn
+    async def process_batch(self, items: list) -> dict:
+        """
+        Processes a slice of inputs in one activity. A failing item doesn't fail the batch; it is reported
+        in its slot instead.
+
+        :return: {"results": [{"ok": True, "result": ...} | {"ok": False, "error": ...}, ...] in input order,
+                  "elapsed_seconds": processing time, used by the workflow to size the next batches}
+        """
+        start = time.perf_counter()
+        results = []
+        for data in items:
+            try:
+                results.append({"ok": True, "result": self._process_item(data)})
+            except Exception as e:
+                results.append({"ok": False, "error": f"{type(e).__name__}: {e}"})
+        return {"results": results, "elapsed_seconds": time.perf_counter() - start}
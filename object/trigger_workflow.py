@@ -1,11 +1,11 @@
 import asyncio
-from temporalio import client
 
 from object.object_activity_workflow import ObjectActivityWorkflow
+from environment.temporal_client import connect_client
 
 
 async def trigger_workflow():
-    temporal_client = await client.Client.connect("localhost:7233")
+    temporal_client = await connect_client()
 
     # Data list to process
     data_list = ["task1", "task2", "task3"]
@@ -1,26 +1,28 @@
 import asyncio
-from temporalio import worker, client
 
 from object.object_activity_workflow import ObjectActivityWorkflow
+from object.result_store import store_object_results
 from object.task_processor import TaskProcessor
+from environment.temporal_client import connect_client
+from environment.worker_launcher import launch_worker, wait_for_shutdown
 
 
 async def main():
     # Create Temporal client
-    temporal_client = await client.Client.connect("localhost:7233")
+    temporal_client = await connect_client()
 
     # Create an instance of TaskProcessor
     task_processor = TaskProcessor(prefix="Worker1")
 
     # Register the worker with the activity instance
-    async with worker.Worker(
+    async with launch_worker(
         temporal_client,
         task_queue="example-task-queue",
         workflows=[ObjectActivityWorkflow],
-        activities=[task_processor.process],  # Register the method
+        activities=[task_processor.process, task_processor.process_batch, store_object_results],
     ):
         print("Worker started")
-        await asyncio.Event().wait()
+        await wait_for_shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,26 +1,26 @@
 # pc_worker.py
 import asyncio
-from temporalio import worker
-from temporalio.client import Client
 
 from main_workflow import MainWorkflow
 from child_workflow import ChildWorkflow
 from pc_activities import process_task_a, process_task_b, process_task_c
+from environment.temporal_client import connect_client
+from environment.worker_launcher import launch_worker, wait_for_shutdown
 
 
 async def main():
     # Connect to Temporal server
-    client = await Client.connect("localhost:7233")
+    client = await connect_client()
 
     # Start the worker
-    async with worker.Worker(
+    async with launch_worker(
             client,
             task_queue="demo-task-queue",
             workflows=[MainWorkflow, ChildWorkflow],
             activities=[process_task_a, process_task_b, process_task_c],
     ):
         print("Worker started. Listening for tasks...")
-        await asyncio.Event().wait()
+        await wait_for_shutdown()
 
 
 if __name__ == "__main__":
@@ -1,9 +1,9 @@
 # trigger_seq_workflow.py
 import asyncio
-from temporalio import client
+from environment.temporal_client import connect_client
 
 async def main():
-    temporal_client = await client.Client.connect("localhost:7233")
+    temporal_client = await connect_client()
 
     # Define message structure
     message = {
@@ -1,19 +1,20 @@
 import asyncio
-from temporalio import worker, client
 from parent_workflow import DynamicSequentialWorkflowExecutor
 from child_workflows import CheckoutWorkflow, PaymentWorkflow, OrderCreationWorkflow
+from environment.temporal_client import connect_client
+from environment.worker_launcher import launch_worker, wait_for_shutdown
 
 
 async def main():
-    temporal_client = await client.Client.connect("localhost:7233")
+    temporal_client = await connect_client()
 
-    async with worker.Worker(
+    async with launch_worker(
             temporal_client,
             task_queue="dynamic-sequential-workflow-queue",
             workflows=[DynamicSequentialWorkflowExecutor, CheckoutWorkflow, PaymentWorkflow, OrderCreationWorkflow]
     ):
         print("Worker started")
-        await asyncio.Event().wait()
+        await wait_for_shutdown()
 
 
 if __name__ == "__main__":
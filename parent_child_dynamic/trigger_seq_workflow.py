@@ -1,11 +1,11 @@
 import asyncio
-from temporalio import client
 
 from parent_child_dynamic.parent_workflow import DynamicSequentialWorkflowExecutor
+from environment.temporal_client import connect_client
 
 
 async def trigger():
-    temporal_client = await client.Client.connect("localhost:7233")
+    temporal_client = await connect_client()
 
     # Define a dynamic sequence
     message1 = {"data": {"user_id": 123, "ip": "1.2.3.4"}, "tasks": ["CheckoutWorkflow", "PaymentWorkflow", "OrderCreationWorkflow"]}
@@ -1,21 +1,19 @@
-from temporalio.worker import Worker
-from temporalio.client import Client
 import asyncio
 from static_workflow import StaticWorkflow
+from environment.temporal_client import connect_client
+from environment.worker_launcher import launch_worker, wait_for_shutdown
 
 
 async def main():
-    client = await Client.connect("localhost:7233")  # Connect to Temporal Server
+    client = await connect_client()  # Connect to Temporal Server
 
-    worker = Worker(
+    async with launch_worker(
         client,
         task_queue="my-task-queue",  # 👈 Task Queue Name (Matches Workflow)
         workflows=[StaticWorkflow],  # Register Workflow
-        activities=[],
-    )
-
-    print("Worker started, listening for tasks...")
-    await worker.run()
+    ):
+        print("Worker started, listening for tasks...")
+        await wait_for_shutdown()
 
 
 if __name__ == '__main__':
@@ -1,10 +1,10 @@
-from temporalio.client import Client
 import asyncio
 import uuid  # Generate unique workflow ID
+from environment.temporal_client import connect_client
 
 
 async def main():
-    client = await Client.connect("localhost:7233")  # Connect to Temporal Server
+    client = await connect_client()  # Connect to Temporal Server
 
     result = await client.start_workflow(
         "StaticWorkflow",  # 👈 Workflow method name
@@ -60,15 +60,31 @@ class DataProcessingTask(BaseTask):
         return await super().run()  # ✅ Calls all steps in sequence
 
 
+import asyncio
 from abc import ABC, abstractmethod
 
+from memo_cache import bypassed_tasks, cache_key, get_memo_cache
+from phases import PHASES
+
 
 ##########Write ######
 class BaseTask(ABC):
     """Abstract base class for all Base tasks."""
 
+    depends_on = ()  # Names of tasks whose results this task needs; it starts as soon as they complete
+    resource_class = "default"  # Concurrency bucket, capped by the workflow's resource_limits
+    # phase -> "fused" | "activity" | "local", or a dict that also sets a timeout and retry policy (see phases.py).
+    # Phases left out are fused into a single activity, like `run`.
+    phase_modes = {}
+    # Opt in to result memoization (see memo_cache.py): identical code + inputs return the cached result.
+    # Only for deterministic tasks without side effects; TASK_CACHE_BYPASS=<name,...> skips the cache per task.
+    memoize = False
+    cache_ttl_seconds = None  # None: the cache's default TTL
+
     def __init__(self):
         self.result = None  # ✅ Store result for later writing
+        self.inputs = None  # Dependency results (task name -> result), for tasks that declare depends_on
+        self.phase_outputs = {}  # phase -> return value, checkpointed between phases
 
     @abstractmethod
     async def precheck(self):
@@ -86,13 +102,49 @@ class BaseTask(ABC):
     async def postprocess(self):
         pass
 
-    async def run(self):
-        """Runs all the steps in sequence and stores the result."""
-        await self.precheck()
-        await self.preprocess()
-        await self.process()
-        await self.postprocess()
-        self.result = f"{self.__class__.__name__} Completed"  # ✅ Store result
+    def build_result(self):
+        """Builds the task result once every phase has run (their outputs are in `self.phase_outputs`)."""
+        return f"{self.__class__.__name__} Completed"
+
+    async def run_phases(self, phases: list, outputs: dict, inputs: dict = None) -> dict:
+        """
+        Runs `phases` in order, skipping any that already have an output, and checkpoints the outputs in
+        the activity heartbeat after each one, so a retried activity resumes at the phase that failed.
+
+        :return: {"outputs": phase outputs so far, "result": task result (only once the last phase has run)}
+        """
+        self.inputs = inputs
+        self.phase_outputs = dict(outputs)
+        if activity.in_activity() and activity.info().heartbeat_details:
+            self.phase_outputs.update(activity.info().heartbeat_details[0])
+
+        for phase in phases:
+            if phase in self.phase_outputs:
+                continue
+            self.phase_outputs[phase] = await getattr(self, phase)()
+            if activity.in_activity():
+                activity.heartbeat(self.phase_outputs)
+
+        response = {"outputs": self.phase_outputs}
+        if all(phase in self.phase_outputs for phase in PHASES):
+            self.result = self.build_result()  # ✅ Store result
+            response["result"] = self.result
+        return response
+
+    async def run(self, inputs: dict = None):
+        """Runs all the steps in sequence and stores the result, or returns the memoized result for these inputs."""
+        cache = get_memo_cache() if self.memoize and type(self).__name__ not in bypassed_tasks() else None
+        if cache is not None:
+            key = cache_key(type(self), inputs)
+            hit, value = await asyncio.to_thread(cache.get, key)
+            if hit:
+                self.result = value
+                return self.result
+
+        await self.run_phases(list(PHASES), {}, inputs)
+
+        if cache is not None:
+            await asyncio.to_thread(cache.put, key, self.result, self.cache_ttl_seconds)
         return self.result
 
 
@@ -115,8 +167,8 @@ class DataProcessingTask(BaseTask, S3ResultWriter):
         return "Data Postprocessing Completed"
 
     @activity.defn(name="DataProcessingTask")
-    async def run(self):
-        return await super().run()  # ✅ Calls all steps in sequence
+    async def run(self, inputs: dict = None):
+        return await super().run(inputs)  # ✅ Calls all steps in sequence
 
 
 class APITask(BaseTask, DBResultWriter):
@@ -135,8 +187,8 @@ class APITask(BaseTask, DBResultWriter):
         return "API Response Postprocessing Completed"
 
     @activity.defn(name="APITask")
-    async def run(self):
-        return await super().run()  # ✅ Calls all steps in sequence
+    async def run(self, inputs: dict = None):
+        return await super().run(inputs)  # ✅ Calls all steps in sequence
 
 
 class DataProcessingTask(BaseTask, S3ResultWriter):
@@ -150,11 +202,14 @@ class DataProcessingTask(BaseTask, S3ResultWriter):
 
     async def postprocess(self): return "Data Postprocessing Completed"
 
+    memoize = True  # Same data file, same output: re-runs after a writer failure come from the cache
+
+    def build_result(self):
+        return {"key": "data-file.json", "data": "Processed data"}
+
     @activity.defn(name="DataProcessingTask")
-    async def run(self):
-        await super().run()
-        self.result = {"key": "data-file.json", "data": "Processed data"}
-        return self.result
+    async def run(self, inputs: dict = None):
+        return await super().run(inputs)
 
 
 class APITask1(BaseTask, APIResultWriter):
@@ -168,16 +223,23 @@ class APITask1(BaseTask, APIResultWriter):
 
     async def postprocess(self): return "API1 Response Processed"
 
+    def build_result(self):
+        return {"endpoint": "https://api.example.com/submit", "data": {"key": "value"}}
+
     @activity.defn(name="APITask1")
-    async def run(self):
-        await super().run()
-        self.result = {"endpoint": "https://api.example.com/submit", "data": {"key": "value"}}
-        return self.result
+    async def run(self, inputs: dict = None):
+        return await super().run(inputs)
 
 
 class DBTask1(BaseTask, DBResultWriter):
     """Writes to DB (Example 1)."""
 
+    # Cheap precheck as a local activity; the expensive step gets its own activity so later failures don't re-run it
+    phase_modes = {
+        "precheck": "local",
+        "process": {"mode": "activity", "start_to_close_seconds": 300, "retry": {"maximum_attempts": 3}},
+    }
+
     async def precheck(self): return "DBTask1 Precheck Passed"
 
     async def preprocess(self): return "DBTask1 Preprocessing Completed"
@@ -186,12 +248,13 @@ class DBTask1(BaseTask, DBResultWriter):
 
     async def postprocess(self): return "DBTask1 Postprocessing Completed"
 
+    def build_result(self):
+        return {"query": "INSERT INTO results (key, value) VALUES (:key, :value)",
+                "params": {"key": "task1", "value": "result1"}}
+
     @activity.defn(name="DBTask1")
-    async def run(self):
-        await super().run()
-        self.result = {"query": "INSERT INTO results (key, value) VALUES (:key, :value)",
-                       "params": {"key": "task1", "value": "result1"}}
-        return self.result
+    async def run(self, inputs: dict = None):
+        return await super().run(inputs)
 
 
 import pandas as pd
@@ -0,0 +1,76 @@
+"""
+Benchmarks APIResultWriter posting against a local stub HTTP server:
+sequential `requests.post` vs. the pooled concurrent transport vs. NDJSON-coalesced batches.
+
+    python bench_http_transport.py --counts 1000 10000 --delay-ms 2
+"""
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from http_transport import HTTPTransport
+
+
+def make_handler(delay: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True  # Headers and body are separate writes; avoid delayed-ACK stalls
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delay)  # Simulated server-side latency
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def bench_sequential(results):
+    for result in results:
+        requests.post(result["endpoint"], json=result["data"]).raise_for_status()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--delay-ms", type=float, default=2.0)
+    parser.add_argument("--skip-sequential-above", type=int, default=1_000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.delay_ms / 1000))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    print(f"{'results':>8}  {'mode':<12}{'seconds':>10}{'results/sec':>14}")
+    for count in args.counts:
+        results = [{"endpoint": f"{base_url}/submit", "data": {"id": i, "value": "x" * 64}} for i in range(count)]
+        modes = {
+            "concurrent": lambda: asyncio.run(HTTPTransport(max_concurrency=args.concurrency).post_all(results)),
+            "ndjson": lambda: asyncio.run(HTTPTransport(max_concurrency=args.concurrency).post_all(
+                results, batch_endpoints={f"{base_url}/submit": f"{base_url}/submit/batch"})),
+        }
+        if count <= args.skip_sequential_above:
+            modes = {"sequential": lambda: bench_sequential(results), **modes}
+
+        for mode, run in modes.items():
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            print(f"{count:>8}  {mode:<12}{elapsed:>10.2f}{count / elapsed:>14,.0f}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Compares per-run BaseTask discovery (walk_packages + import + inspect inside the workflow) with the
+task registry built once at worker startup, for generated packages of 10/100/1000 task classes.
+
+The workflow sandbox re-imports non-passthrough modules for every run and replay, so per-run discovery is
+measured cold (generated modules purged from sys.modules). With the registry, the workflow only decodes the
+spec list it receives as input.
+
+    python bench_task_registry.py --counts 10 100 1000
+"""
+import argparse
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import sys
+import tempfile
+import time
+
+from base_task import BaseTask
+from task_registry import build_registry
+
+TASK_TEMPLATE = '''from base_task import BaseTask
+from result_writer import S3ResultWriter
+
+
+class BenchTask{index}(BaseTask, S3ResultWriter):
+    async def precheck(self): return "ok"
+
+    async def preprocess(self): return "ok"
+
+    async def process(self): return "ok"
+
+    async def postprocess(self): return "ok"
+'''
+
+
+def discover_Base_tasks(package):
+    """The per-run discovery DynamicWorkflow used to do."""
+    discovered_tasks = {}
+    for _, module_name, _ in pkgutil.walk_packages(package.__path__, package.__name__ + "."):
+        module = importlib.import_module(module_name)
+        for _, obj in inspect.getmembers(module, inspect.isclass):
+            if issubclass(obj, BaseTask) and obj is not BaseTask:
+                discovered_tasks[obj.__name__] = obj
+    return discovered_tasks
+
+
+def make_package(root: str, name: str, count: int):
+    package_dir = os.path.join(root, name)
+    os.makedirs(package_dir)
+    open(os.path.join(package_dir, "__init__.py"), "w").close()
+    for index in range(count):
+        with open(os.path.join(package_dir, f"task_{index}.py"), "w") as f:
+            f.write(TASK_TEMPLATE.format(index=index))
+
+
+def purge(package_name: str):
+    for module_name in [m for m in sys.modules if m == package_name or m.startswith(package_name + ".")]:
+        del sys.modules[module_name]
+    importlib.invalidate_caches()
+
+
+def timed(fn, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>6}  {'discovery/run ms':>17}  {'registry cold ms':>17}  {'registry cached ms':>19}"
+          f"  {'specs decode/run ms':>20}")
+    with tempfile.TemporaryDirectory() as root:
+        sys.path.insert(0, root)
+        for count in args.counts:
+            package_name = f"bench_tasks_{count}"
+            make_package(root, package_name, count)
+            manifest = [f"{package_name}.task_{i}:BenchTask{i}" for i in range(count)]
+            cache_path = os.path.join(root, f"{package_name}.registry.json")
+
+            def discover_cold():
+                purge(package_name)
+                discover_Base_tasks(importlib.import_module(package_name))
+
+            discovery = timed(discover_cold, args.runs)
+
+            purge(package_name)
+            cold = timed(lambda: build_registry(manifest, cache_path=cache_path, use_entry_points=False))
+            cached = timed(lambda: build_registry(manifest, cache_path=cache_path, use_entry_points=False), args.runs)
+
+            encoded = json.dumps(build_registry(manifest, cache_path=cache_path, use_entry_points=False))
+            decode = timed(lambda: json.loads(encoded), args.runs)
+
+            print(f"{count:>6}  {discovery * 1000:>17.1f}  {cold * 1000:>17.1f}  {cached * 1000:>19.1f}"
+                  f"  {decode * 1000:>20.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+import io
+import uuid
+
+import pandas as pd
+from sqlalchemy import Table
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# DB-API paramstyle -> positional placeholder builder
+_PLACEHOLDERS = {
+    "qmark": lambda i: "?",
+    "format": lambda i: "%s",
+    "pyformat": lambda i: "%s",
+    "numeric": lambda i: f":{i + 1}",
+}
+
+
+def resolve_table(key, metadata=None) -> Table:
+    """Returns the Table behind an ORM model class, a Table, or a table name looked up in `metadata`."""
+    if isinstance(key, Table):
+        return key
+    if hasattr(key, "__table__"):
+        return key.__table__
+    if isinstance(key, str) and metadata is not None and key in metadata.tables:
+        return metadata.tables[key]
+    raise ValueError(f"Cannot resolve a table for {key!r}")
+
+
+def iter_chunks(df: pd.DataFrame, chunk_size: int):
+    """Yields row slices of at most `chunk_size` rows (views, no copies of the full frame)."""
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def restore_integer_columns(table: Table, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Casts float columns that back integer table columns to nullable Int64: a NaN turns an int column into
+    float64, which would be written as "1.0" and rejected by COPY.
+    """
+    casts = {}
+    for column in df.columns:
+        table_column = table.columns.get(str(column))
+        if table_column is None or df[column].dtype.kind != "f":
+            continue
+        try:
+            if table_column.type.python_type is int:
+                casts[column] = "Int64"  # Raises on non-integral values instead of truncating them
+        except NotImplementedError:
+            continue
+    return df.astype(casts) if casts else df
+
+
+def copy_dataframe(dbapi_connection, table_sql: str, columns_sql: str, df: pd.DataFrame, chunk_size: int) -> int:
+    """
+    Streams a DataFrame into PostgreSQL with COPY ... FROM STDIN, one CSV chunk at a time.
+
+    Missing values are written as a random token declared as COPY's NULL string. With the default NULL (an
+    unquoted empty field), empty strings would load as NULL too.
+    """
+    null_token = f"__null_{uuid.uuid4().hex}__"
+    copy_sql = f"COPY {table_sql} ({columns_sql}) FROM STDIN WITH (FORMAT csv, NULL '{null_token}')"
+    with dbapi_connection.cursor() as cursor:
+        for chunk in iter_chunks(df, chunk_size):
+            buffer = io.StringIO()
+            chunk.to_csv(buffer, header=False, index=False, na_rep=null_token)
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+    return len(df)
+
+
+def executemany_dataframe(connection, table_sql: str, columns_sql: str, df: pd.DataFrame, chunk_size: int) -> int:
+    """Inserts a DataFrame with chunked `executemany` of positional tuples (SQLite and other dialects)."""
+    paramstyle = connection.dialect.paramstyle
+    if paramstyle not in _PLACEHOLDERS:
+        raise ValueError(f"Unsupported DB-API paramstyle for bulk load: {paramstyle}")
+
+    placeholders = ", ".join(_PLACEHOLDERS[paramstyle](i) for i in range(len(df.columns)))
+    insert_sql = f"INSERT INTO {table_sql} ({columns_sql}) VALUES ({placeholders})"
+
+    for chunk in iter_chunks(df, chunk_size):
+        # Box to Python objects per chunk only, so drivers can bind the values and NaN becomes NULL
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        connection.exec_driver_sql(insert_sql, list(chunk.itertuples(index=False, name=None)))
+    return len(df)
+
+
+def bulk_load(session, table_data_map: dict, chunk_size: int = DEFAULT_CHUNK_SIZE, metadata=None) -> dict:
+    """
+    Loads every DataFrame in `table_data_map` on the session's connection without building row dicts.
+
+    All tables are written on the same connection inside the session's open transaction, so the caller's
+    single `commit()` / `rollback()` still covers the whole map.
+
+    :param session: SQLAlchemy ORM session (a transaction is begun if none is active).
+    :param table_data_map: Dictionary where keys are ORM model classes, Tables or table names and values are DataFrames.
+    :param chunk_size: Maximum number of rows buffered per COPY / executemany round-trip.
+    :param metadata: MetaData used to resolve table-name keys.
+    :return: Dictionary of table name -> rows written.
+    """
+    connection = session.connection()
+
+    row_counts = {}
+    for key, df in table_data_map.items():
+        table = resolve_table(key, metadata)
+        if not isinstance(df, pd.DataFrame):
+            raise ValueError(f"Expected a Pandas DataFrame for {table.name}, got {type(df)}")
+        row_counts[table.name] = load_dataframe(connection, table, df, chunk_size)
+
+    return row_counts
+
+
+def load_dataframe(connection, table: Table, df: pd.DataFrame, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Writes one DataFrame into `table` on a Core connection, via COPY on psycopg2 and executemany elsewhere."""
+    if df.empty:
+        return 0
+
+    dialect = connection.dialect
+    preparer = dialect.identifier_preparer
+    table_sql = preparer.format_table(table)
+    columns_sql = ", ".join(preparer.quote(str(column)) for column in df.columns)
+
+    if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+        df = restore_integer_columns(table, df)
+        return copy_dataframe(connection.connection.dbapi_connection, table_sql, columns_sql, df, chunk_size)
+    return executemany_dataframe(connection, table_sql, columns_sql, df, chunk_size)
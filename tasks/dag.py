@@ -0,0 +1,140 @@
+import asyncio
+
+FAIL_FAST = "fail_fast"
+CONTINUE = "continue"  # Keep running branches that don't depend on the failed node
+
+
+class DAGError(Exception):
+    """Raised for invalid graphs (unknown dependencies or cycles)."""
+
+
+class SkipNode(Exception):
+    """Raised by `run_node` to record a node as skipped (e.g. an input it needs is unavailable) rather than failed."""
+
+
+class NodeFailed(Exception):
+    """Raised in fail-fast mode with the name of the first node that failed."""
+
+    def __init__(self, node: str, error: BaseException):
+        super().__init__(f"{node} failed: {error}")
+        self.node = node
+        self.error = error
+
+
+class TaskGraph:
+    """
+    Dependency graph of task/writer specs (dicts with "name", "depends_on" and "resource_class").
+
+    Pure Python with no I/O, so it is safe to build and run inside a workflow; ready nodes are always
+    started in declaration order, which keeps scheduling deterministic across replays. A node with
+    "allow_partial" set (e.g. a writer) still runs when some dependencies failed, with only the successful
+    dependencies' results.
+    """
+
+    def __init__(self, specs: list):
+        self.specs = {spec["name"]: spec for spec in specs}
+        self.order = {spec["name"]: index for index, spec in enumerate(specs)}
+        self.dependencies = {name: set(spec.get("depends_on") or ()) for name, spec in self.specs.items()}
+        self.dependents = {name: set() for name in self.specs}
+        for name, dependencies in self.dependencies.items():
+            for dependency in dependencies:
+                if dependency not in self.specs:
+                    raise DAGError(f"{name} depends on unknown node {dependency}")
+                self.dependents[dependency].add(name)
+        self.topological_order()  # Fail early on cycles
+
+    def topological_order(self) -> list:
+        remaining = {name: len(dependencies) for name, dependencies in self.dependencies.items()}
+        ready = sorted((name for name, count in remaining.items() if count == 0), key=self.order.get)
+        ordered = []
+        while ready:
+            name = ready.pop(0)
+            ordered.append(name)
+            for dependent in sorted(self.dependents[name], key=self.order.get):
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+            ready.sort(key=self.order.get)
+        if len(ordered) != len(self.specs):
+            raise DAGError(f"Dependency cycle among: {sorted(set(self.specs) - set(ordered))}")
+        return ordered
+
+    async def run(self, run_node, max_concurrency: int = 8, resource_limits: dict = None,
+                  failure_policy: str = FAIL_FAST) -> dict:
+        """
+        Runs every node as soon as its dependencies succeed, with at most `max_concurrency` nodes in flight
+        overall and `resource_limits[resource_class]` per resource class.
+
+        :param run_node: `async (spec, dependency_results) -> result` that executes one node.
+        :return: name -> {"status": "completed" | "failed" | "skipped", "result" | "error": ...}
+        """
+        resource_limits = resource_limits or {}
+        outcomes = {}
+        waiting = {name: set(dependencies) for name, dependencies in self.dependencies.items()}
+        running = {}  # asyncio.Task -> name
+        in_flight_by_class = {}
+
+        def can_start(name):
+            resource_class = self.specs[name].get("resource_class", "default")
+            limit = resource_limits.get(resource_class)
+            return limit is None or in_flight_by_class.get(resource_class, 0) < limit
+
+        while waiting or running:
+            ready = sorted((name for name, pending in waiting.items() if not pending), key=self.order.get)
+            for name in ready:
+                if len(running) >= max_concurrency:
+                    break
+                if not can_start(name):
+                    continue
+                del waiting[name]
+                resource_class = self.specs[name].get("resource_class", "default")
+                in_flight_by_class[resource_class] = in_flight_by_class.get(resource_class, 0) + 1
+                dependency_results = {
+                    dep: outcomes[dep]["result"] for dep in sorted(self.dependencies[name])
+                    if outcomes[dep]["status"] == "completed"
+                }
+                running[asyncio.create_task(run_node(self.specs[name], dependency_results))] = name
+
+            if not running:
+                break  # Everything left is waiting on a failed or skipped node
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=lambda t: self.order[running[t]]):
+                name = running.pop(task)
+                resource_class = self.specs[name].get("resource_class", "default")
+                in_flight_by_class[resource_class] -= 1
+
+                error = task.exception()
+                if error is None:
+                    outcomes[name] = {"status": "completed", "result": task.result()}
+                    for dependent in self.dependents[name]:
+                        if dependent in waiting:
+                            waiting[dependent].discard(name)
+                    continue
+
+                if isinstance(error, SkipNode):
+                    outcomes[name] = {"status": "skipped", "error": str(error)}
+                    self._release_dependents(name, waiting, outcomes)
+                    continue
+
+                outcomes[name] = {"status": "failed", "error": str(error)}
+                if failure_policy == FAIL_FAST:
+                    for other in running:
+                        other.cancel()
+                    await asyncio.gather(*running, return_exceptions=True)
+                    raise NodeFailed(name, error)
+                self._release_dependents(name, waiting, outcomes)
+
+        return outcomes
+
+    def _release_dependents(self, name: str, waiting: dict, outcomes: dict):
+        """After `name` failed or was skipped: partial nodes stop waiting for it, all others are skipped."""
+        for dependent in sorted(self.dependents[name], key=self.order.get):
+            if dependent not in waiting:
+                continue
+            if self.specs[dependent].get("allow_partial"):
+                waiting[dependent].discard(name)
+            else:
+                del waiting[dependent]
+                outcomes[dependent] = {"status": "skipped", "error": f"dependency {name} did not complete"}
+                self._release_dependents(dependent, waiting, outcomes)
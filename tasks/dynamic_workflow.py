@@ -1,190 +1,250 @@
-import pkgutil
-import importlib
-import inspect
 from temporalio import workflow
 from datetime import timedelta
-from Base_task import BaseTask
-from typing import List
 
-def discover_Base_tasks(package):
-    """Dynamically discover all classes that inherit from BaseTask."""
-    discovered_tasks = {}
-
-    for _, module_name, _ in pkgutil.walk_packages(package.__path__, package.__name__ + "."):
-        module = importlib.import_module(module_name)
-
-        # Find all classes in the module
-        for _, obj in inspect.getmembers(module, inspect.isclass):
-            if issubclass(obj, BaseTask) and obj is not BaseTask:  # Ignore base class
-                discovered_tasks[obj.__name__] = obj  # Store class reference
-
-    return discovered_tasks
+with workflow.unsafe.imports_passed_through():
+    from converters.claim_check import ClaimCheck, collect_claim_checks, release_claim_checks, \
+        release_workflow_claim_checks
+    from dag import FAIL_FAST, NodeFailed, SkipNode, TaskGraph
+    from environment.retry_policies import retry_policy
+    from phases import LOCAL, phase_activity_name
+    from temporalio.exceptions import ApplicationError
+    from task_registry import WRITER_NAMES
+    from task_results import record_task_results
+
+DEFAULT_SEGMENT_SIZE = 100
+DEFAULT_MAX_HISTORY_EVENTS = 10_000
+DEFAULT_MAX_HISTORY_BYTES = 20 * 1024 * 1024
+MAX_LISTED_FAILURES = 20
 
 @workflow.defn
 class DynamicWorkflow:
-    @workflow.run
-    async def run(self) -> dict:
-        wf_info = workflow.info()
-        workflow_id = wf_info.workflow_id
-        run_id = wf_info.run_id
-
-        results = {
-            "workflow_id": workflow_id,
-            "run_id": run_id,
-            "task_results": []
-        }
-
-        # 🔥 Discover all BaseTask implementations dynamically
-        from tasks import base_task  # 👈 Import the package where tasks are defined
-        task_classes = discover_Base_tasks(base_task)
-
-        # ✅ Execute each task sequentially
-        for task_name, task_class in task_classes.items():
-            task_instance = task_class()  # ✅ Instantiate the task dynamically
-            step_result = await workflow.execute_activity(
-                task_instance.run,  # ✅ Run the entire task
-                start_to_close_timeout=timedelta(seconds=60),
-            )
-            results["task_results"].append({"task_name": task_name, "result": step_result})
-
-        return results
-
-
-#########
-import pkgutil
-import importlib
-import inspect
-from temporalio import workflow
-from datetime import timedelta
-from result_writer import DBResultWriter, S3ResultWriter  # ✅ Import result writers
-
-def discover_Base_tasks(package):
-    """Dynamically discover all BaseTask subclasses."""
-    discovered_tasks = {}
-
-    for _, module_name, _ in pkgutil.walk_packages(package.__path__, package.__name__ + "."):
-        module = importlib.import_module(module_name)
-
-        for _, obj in inspect.getmembers(module, inspect.isclass):
-            if issubclass(obj, BaseTask) and obj is not BaseTask:
-                discovered_tasks[obj.__name__] = obj  # Store class reference
-
-    return discovered_tasks
-
-@workflow.defn
-class DynamicWorkflow:
-    @workflow.run
-    async def run(self) -> dict:
-        wf_info = workflow.info()
-        workflow_id = wf_info.workflow_id
-        run_id = wf_info.run_id
-
-        results = {
-            "workflow_id": workflow_id,
-            "run_id": run_id,
-            "task_results": []
-        }
-
-        from tasks import base_task
-        task_classes = discover_Base_tasks(base_task)
-
-        for task_name, task_class in task_classes.items():
-            task_instance = task_class()
-            step_result = await workflow.execute_activity(
-                task_instance.run,
-                start_to_close_timeout=timedelta(seconds=60),
-            )
-            results["task_results"].append({"task_name": task_name, "result": step_result})
-
-            # ✅ Write results after all tasks complete
-            writer_instance = task_instance  # Task already inherits a writer
-            write_result = await workflow.execute_activity(
-                writer_instance.write,
-                step_result,  # ✅ Pass the stored result
-                start_to_close_timeout=timedelta(seconds=30),
-            )
-            results["task_results"].append({"task_name": f"{task_name}_write", "result": write_result})
-
-        return results
-
-
-
-###########
-
-import pkgutil
-import importlib
-import inspect
-from temporalio import workflow
-from datetime import timedelta
-from result_writer import S3ResultWriter, APIResultWriter, DBResultWriter
-
-def discover_Base_tasks(package):
-    """Dynamically discover all BaseTask subclasses."""
-    discovered_tasks = {}
-
-    for _, module_name, _ in pkgutil.walk_packages(package.__path__, package.__name__ + "."):
-        module = importlib.import_module(module_name)
-
-        for _, obj in inspect.getmembers(module, inspect.isclass):
-            if issubclass(obj, BaseTask) and obj is not BaseTask:
-                discovered_tasks[obj.__name__] = obj  # Store class reference
+    def __init__(self):
+        self.summary = {}
 
-    return discovered_tasks
+    @workflow.query
+    def progress(self) -> dict:
+        """Compact summary of the run so far (per-task results live in the task result store)."""
+        return self.summary
 
-@workflow.defn
-class DynamicWorkflow:
     @workflow.run
-    async def run(self) -> dict:
-        wf_info = workflow.info()
-        workflow_id = wf_info.workflow_id
-        run_id = wf_info.run_id
-
-        results = {
-            "workflow_id": workflow_id,
-            "run_id": run_id,
-            "task_results": []
-        }
-
-        from tasks import base_task
-        task_classes = discover_Base_tasks(base_task)
-
-        grouped_results = {
-            "S3ResultWriter": [],
-            "APIResultWriter": [],
-            "DBResultWriter": []
+    async def run(self, task_specs: list, options: dict = None, state: dict = None) -> dict:
+        """
+        Runs the tasks and writers described by `task_specs` (built once by `task_registry.build_registry()`)
+        as a dependency graph: every node starts as soon as the nodes it depends on have completed.
+
+        The specs are workflow input, so nothing is discovered or imported here and every replay sees
+        exactly the same graph.
+
+        Tasks run in segments of `segment_size` (in dependency order), each followed by its writers. After a
+        segment its per-task results go to the task result store, only counters stay in the workflow, and once
+        history grows past the thresholds the workflow continues as new with a cursor into the task list.
+
+        :param options: Optional scheduling settings:
+            - max_concurrency: Nodes in flight at once (default 8).
+            - resource_limits: resource_class -> nodes of that class in flight at once.
+            - failure_policy: "fail_fast" (default) cancels everything on the first failure and fails the
+              workflow; "continue" keeps running branches that don't depend on the failed task.
+            - segment_size: Tasks per segment (default 100).
+            - max_history_events / max_history_bytes: Continue-as-new thresholds (Temporal's own suggestion
+              is always honoured too).
+        :param state: Cursor, summary and carried dependency results, passed on by continue-as-new.
+        """
+        options = options or {}
+        state = state or {}
+        try:
+            result = await self.run_segments(task_specs, options, state)
+        except workflow.ContinueAsNewError:
+            raise  # The next run still reads the carried claim checks
+        except BaseException:
+            await self.release_workflow_claim_checks()
+            raise
+        await self.release_workflow_claim_checks()
+        return result
+
+    async def run_segments(self, task_specs: list, options: dict, state: dict) -> dict:
+        workflow_id = workflow.info().workflow_id
+        writer_specs = [spec for spec in task_specs if spec.get("kind") == "writer"]
+        tasks = [spec for spec in task_specs if spec.get("kind", "task") == "task"]
+        if not writer_specs:  # Specs from an older registry: writers in the classic S3 → API → DB order
+            writer_specs = [
+                {"name": name, "kind": "writer", "activity": name, "depends_on": list(WRITER_NAMES[:index][-1:])}
+                for index, name in enumerate(WRITER_NAMES)
+            ]
+        specs_by_name = {spec["name"]: spec for spec in tasks}
+        order = TaskGraph(tasks).topological_order()
+
+        self.summary = state.get("summary") or {
+            "workflow_id": workflow_id, "total": len(order), "cursor": 0, "segments": 0, "runs": 0,
+            "completed": 0, "failed": 0, "skipped": 0, "writes": 0, "offloaded_bytes": 0, "failures": [],
         }
-
-        for task_name, task_class in task_classes.items():
-            task_instance = task_class()
-            task_result = await workflow.execute_activity(
-                task_instance.run,
+        self.summary["runs"] += 1
+        carried = state.get("carried", {})  # Results of finished tasks that later tasks still depend on
+        segment_size = options.get("segment_size", DEFAULT_SEGMENT_SIZE)
+
+        while self.summary["cursor"] < len(order):
+            cursor = self.summary["cursor"]
+            chunk = [specs_by_name[name] for name in order[cursor:cursor + segment_size]]
+
+            produced = {}
+            idle_writers = set()
+            try:
+                outcomes = await self.run_segment(chunk, writer_specs, carried, produced, options, idle_writers)
+            except NodeFailed as e:
+                raise ApplicationError(str(e), type="NodeFailed", non_retryable=True) from e.error
+
+            # Writers with nothing to write leave no entry; failed and skipped ones are recorded like tasks
+            entries = [self.result_entry(spec, outcomes[spec["name"]]) for spec in chunk + writer_specs
+                       if spec["name"] not in idle_writers]
+            await workflow.execute_activity(
+                record_task_results,
+                args=[workflow_id, self.summary["segments"], entries],
                 start_to_close_timeout=timedelta(seconds=60),
             )
-            results["task_results"].append({"task_name": task_name, "result": task_result})
-
-            # 🔥 Group results by writer type
-            writer_type = task_instance.__class__.__bases__[1].__name__
-            grouped_results[writer_type].append(task_result)
-
-        # ✅ Execute writers in order: S3 → API → DB
-        for writer_cls in [S3ResultWriter, APIResultWriter, DBResultWriter]:
-            writer_name = writer_cls.__name__
-            if grouped_results[writer_name]:
-                writer_instance = writer_cls()
-                write_result = await workflow.execute_activity(
-                    writer_instance.write,
-                    grouped_results[writer_name],
+            self.add_to_summary(entries)
+            self.summary["cursor"] = cursor = cursor + len(chunk)
+
+            # 🔹 Carry forward only what later tasks depend on; offloaded payloads nobody needs any more are released
+            needed = {dep for name in order[cursor:] for dep in specs_by_name[name].get("depends_on", ())}
+            available = {**carried, **produced}
+            carried = {name: result for name, result in available.items() if name in needed}
+            await self.release_claim_checks({name: result for name, result in available.items() if name not in needed})
+
+            if cursor < len(order) and self.history_exceeded(options):
+                workflow.continue_as_new(args=[task_specs, options, {"summary": self.summary, "carried": carried}])
+
+        return {**self.summary, "run_id": workflow.info().run_id}
+
+    async def run_segment(self, chunk: list, writer_specs: list, carried: dict, produced: dict,
+                          options: dict, idle_writers: set) -> dict:
+        """
+        Runs one segment's tasks and their writers as a DAG; completed task results are added to `produced`.
+
+        Dependencies on tasks from earlier segments are served from `carried`; a task whose earlier dependency
+        did not complete is skipped. Writers left with no input don't run and are added to `idle_writers`.
+        """
+        chunk_names = {spec["name"] for spec in chunk}
+        # Segments are numbered across continue-as-new runs, so this names each writer call of the workflow once
+        load_key_prefix = f"{workflow.info().workflow_id}/{self.summary['segments']}"
+
+        # 🔥 Each writer also depends on the tasks whose results it writes; it runs with whichever of them succeeded
+        feeding_tasks = {spec["name"]: [] for spec in writer_specs}
+        for spec in chunk:
+            if spec.get("writer") in feeding_tasks:
+                feeding_tasks[spec["writer"]].append(spec["name"])
+        graph = TaskGraph(
+            [{**spec, "depends_on": [dep for dep in spec.get("depends_on", ()) if dep in chunk_names]}
+             for spec in chunk]
+            + [{**spec, "depends_on": [*spec.get("depends_on", ()), *feeding_tasks[spec["name"]]],
+                "allow_partial": True}
+               for spec in writer_specs]
+        )
+        original_specs = {spec["name"]: spec for spec in chunk}
+
+        async def run_node(spec: dict, dependency_results: dict):
+            if spec.get("kind", "task") == "writer":
+                writer_input = [dependency_results[name] for name in feeding_tasks[spec["name"]]
+                                if name in dependency_results]
+                if not writer_input:
+                    idle_writers.add(spec["name"])
+                    return None
+                return await workflow.execute_activity(
+                    spec["activity"],
+                    args=[writer_input, f"{load_key_prefix}/{spec['name']}"],
                     start_to_close_timeout=timedelta(seconds=30),
                 )
-                results["task_results"].append({"task_name": f"{writer_name}_write", "result": write_result})
 
-
-        # write_tasks.append(workflow.execute_activity(
-        #     writer_instance.write,
-        #     grouped_results[writer_name],
-        #     start_to_close_timeout=timedelta(seconds=30),
-        # ))
-        #
-        # await asyncio.gather(*write_tasks)  # ✅ Runs all writers in parallel
-
-        return results
+            # Tasks that declare dependencies receive their results (task name -> result)
+            depends_on = original_specs[spec["name"]].get("depends_on", ())
+            inputs = None
+            if depends_on:
+                missing = [dep for dep in depends_on if dep not in chunk_names and dep not in carried]
+                if missing:
+                    raise SkipNode(f"dependency {missing[0]} did not complete")
+                inputs = {dep: dependency_results[dep] if dep in chunk_names else carried[dep] for dep in depends_on}
+
+            if spec.get("phase_plan"):
+                task_result = await self.run_phase_plan(spec, inputs)
+            else:
+                task_result = await workflow.execute_activity(
+                    spec["activity"],
+                    args=[inputs] if inputs is not None else [],
+                    start_to_close_timeout=timedelta(seconds=60),
+                )
+            produced[spec["name"]] = task_result
+            return task_result
+
+        return await graph.run(
+            run_node,
+            max_concurrency=options.get("max_concurrency", 8),
+            resource_limits=options.get("resource_limits"),
+            failure_policy=options.get("failure_policy", FAIL_FAST),
+        )
+
+    async def run_phase_plan(self, spec: dict, inputs: dict = None):
+        """
+        Runs a task's phases step by step (see `phases.phase_plan`). Each step's outputs are recorded in
+        history, so a failing step is retried on its own and never re-runs the steps before it.
+        """
+        outputs = {}
+        response = {}
+        for step in spec["phase_plan"]:
+            execute = workflow.execute_local_activity if step["mode"] == LOCAL else workflow.execute_activity
+            response = await execute(
+                phase_activity_name(spec["name"]),
+                args=[step["phases"], outputs, inputs],
+                start_to_close_timeout=timedelta(seconds=step["start_to_close_seconds"]),
+                retry_policy=retry_policy(step["retry"]),
+            )
+            outputs = response["outputs"]
+        return response["result"]
+
+    @staticmethod
+    def result_entry(spec: dict, outcome: dict) -> dict:
+        task_name = f"{spec['name']}_write" if spec.get("kind") == "writer" else spec["name"]
+        if outcome["status"] != "completed":
+            return {"task_name": task_name, **outcome}
+        if isinstance(outcome["result"], ClaimCheck):
+            # Large results arrive as claim-check references; only the reference is kept
+            return {"task_name": task_name, "offloaded_bytes": outcome["result"].size}
+        return {"task_name": task_name, "result": outcome["result"]}
+
+    def add_to_summary(self, entries: list):
+        self.summary["segments"] += 1
+        for entry in entries:
+            status = entry.get("status", "completed")
+            if entry["task_name"].endswith("_write") and status == "completed":
+                self.summary["writes"] += 1
+                continue
+            self.summary[status] += 1
+            self.summary["offloaded_bytes"] += entry.get("offloaded_bytes", 0)
+            if status != "completed" and len(self.summary["failures"]) < MAX_LISTED_FAILURES:
+                self.summary["failures"].append(entry)
+
+    @staticmethod
+    def history_exceeded(options: dict) -> bool:
+        info = workflow.info()
+        return (
+            info.is_continue_as_new_suggested()
+            or info.get_current_history_length() >= options.get("max_history_events", DEFAULT_MAX_HISTORY_EVENTS)
+            or info.get_current_history_size() >= options.get("max_history_bytes", DEFAULT_MAX_HISTORY_BYTES)
+        )
+
+    @staticmethod
+    async def release_workflow_claim_checks():
+        # 🧹 The workflow is closing: every blob offloaded for it, in any run, goes
+        await workflow.execute_activity(
+            release_workflow_claim_checks,
+            workflow.info().workflow_id,
+            start_to_close_timeout=timedelta(seconds=300),
+        )
+
+    @staticmethod
+    async def release_claim_checks(values: dict):
+        # 🧹 Garbage-collect offloaded payloads that no later task will read
+        claim_checks = collect_claim_checks(values)
+        if claim_checks:
+            await workflow.execute_activity(
+                release_claim_checks,
+                claim_checks,
+                start_to_close_timeout=timedelta(seconds=60),
+            )
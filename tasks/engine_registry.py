@@ -0,0 +1,131 @@
+import logging
+import os
+import threading
+import time
+
+import boto3
+import psycopg2
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+IAM_TOKEN_TTL_SECONDS = 15 * 60  # RDS auth tokens are valid for 15 minutes
+IAM_TOKEN_REFRESH_SECONDS = 10 * 60  # Refresh well before expiry
+
+_engines = {}
+_token_providers = {}
+_registry_lock = threading.Lock()
+
+
+def pool_settings(**overrides) -> dict:
+    """Connection-pool settings from the environment (DB_POOL_SIZE, DB_MAX_OVERFLOW, ...), with overrides."""
+    settings = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    settings.update(overrides)
+    return settings
+
+
+class IAMTokenProvider:
+    """Caches an RDS IAM auth token and refreshes it on a background thread before it expires."""
+
+    def __init__(self, host: str, port: int, user: str, region: str = None,
+                 refresh_seconds: int = IAM_TOKEN_REFRESH_SECONDS):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.refresh_seconds = refresh_seconds
+        self._rds_client = boto3.Session(region_name=region).client("rds")
+        self._lock = threading.Lock()
+        self._token = None
+        self._fetched_at = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def token(self) -> str:
+        """Returns the cached token, fetching synchronously if the background refresh fell behind."""
+        with self._lock:
+            if self._token is None or time.monotonic() - self._fetched_at >= self.refresh_seconds:
+                self._refresh_locked()
+            return self._token
+
+    def refresh(self):
+        with self._lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self):
+        self._token = self._rds_client.generate_db_auth_token(
+            DBHostname=self.host, Port=self.port, DBUsername=self.user
+        )
+        self._fetched_at = time.monotonic()
+
+    def start(self):
+        if self._thread is None:
+            self.refresh()
+            self._thread = threading.Thread(target=self._refresh_loop, name=f"iam-token-{self.host}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception:
+                # token() falls back to a synchronous fetch, so a failed background refresh is not fatal
+                logger.exception("Background IAM token refresh failed for %s", self.host)
+
+
+def get_engine(dsn: str, **pool_overrides):
+    """Returns the process-wide pooled engine for `dsn`, creating it on first use."""
+    with _registry_lock:
+        engine = _engines.get(dsn)
+        if engine is None:
+            if make_url(dsn).get_backend_name() == "sqlite":
+                engine = create_engine(dsn)  # SQLite pools do not take size/overflow settings
+            else:
+                engine = create_engine(dsn, **pool_settings(**pool_overrides))
+            _engines[dsn] = engine
+        return engine
+
+
+def get_iam_engine(host: str, user: str, database: str, port: int = 5432, region: str = None, **pool_overrides):
+    """
+    Returns the process-wide pooled engine for an RDS instance using IAM authentication.
+
+    Connections are opened by a token-aware `creator`, so each new pooled connection picks up the current
+    token and existing connections keep working across token rotation.
+    """
+    key = f"iam+postgresql://{user}@{host}:{port}/{database}"
+    with _registry_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            provider = IAMTokenProvider(host, port, user, region=region)
+            provider.start()
+
+            def creator():
+                return psycopg2.connect(
+                    host=host, port=port, user=user, dbname=database,
+                    password=provider.token(), sslmode="require",
+                )
+
+            engine = create_engine("postgresql+psycopg2://", creator=creator, **pool_settings(**pool_overrides))
+            _token_providers[key] = provider
+            _engines[key] = engine
+        return engine
+
+
+def dispose_all():
+    """Stops token refreshers and closes every pooled connection (call on worker shutdown)."""
+    with _registry_lock:
+        for provider in _token_providers.values():
+            provider.stop()
+        for engine in _engines.values():
+            engine.dispose()
+        _token_providers.clear()
+        _engines.clear()
@@ -0,0 +1,134 @@
+import asyncio
+import functools
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+from temporalio.common import RetryPolicy
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+DEFAULT_RETRY_POLICY = RetryPolicy(
+    initial_interval=timedelta(seconds=1),
+    backoff_coefficient=2,
+    maximum_interval=timedelta(seconds=60),
+    maximum_attempts=5,
+)
+
+
+class HTTPTransport:
+    """
+    Async facade over a keep-alive `requests.Session`.
+
+    Blocking calls run on the transport's own `max_concurrency` threads so the event loop stays free, at most
+    `max_concurrency` posts are in flight, and retries back off with `asyncio.sleep` so a retrying post never
+    holds up the others. A post is retried until the policy's `maximum_attempts` (0: unlimited) or
+    `retry_deadline` seconds, whichever comes first.
+    """
+
+    def __init__(self, max_concurrency: int = 32, retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+                 timeout: float = 30.0, max_batch_size: int = 500, retry_deadline: float = 300.0):
+        self.max_concurrency = max_concurrency
+        self.retry_policy = retry_policy
+        self.timeout = timeout
+        self.max_batch_size = max_batch_size
+        self.retry_deadline = retry_deadline
+        self._session = None
+        self._executor = None
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.max_concurrency, pool_maxsize=self.max_concurrency)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Not the loop's default executor: that one is capped at min(32, cpu + 4) threads and shared with S3
+        # and DB work, so it would quietly lower max_concurrency
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="http-post")
+        return self._executor
+
+    def close(self):
+        """Shuts down the post threads and the session's connections (both are recreated on the next post)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff capped at the policy maximum, with full jitter."""
+        policy = self.retry_policy
+        delay = policy.initial_interval.total_seconds() * (policy.backoff_coefficient ** attempt)
+        if policy.maximum_interval is not None:
+            delay = min(delay, policy.maximum_interval.total_seconds())
+        return random.uniform(0, delay)
+
+    async def post(self, url: str, json_body=None, data=None, headers=None) -> requests.Response:
+        """POSTs once per attempt, retrying connection errors and retryable status codes."""
+        max_attempts = self.retry_policy.maximum_attempts
+        deadline = time.monotonic() + self.retry_deadline
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            error = None
+            try:
+                response = await loop.run_in_executor(self.executor, functools.partial(
+                    self.session.post, url, json=json_body, data=data, headers=headers, timeout=self.timeout
+                ))
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    response.raise_for_status()  # ❌ Other 4xx errors won't succeed on retry
+                    return response
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+
+            delay = self.backoff(attempt)
+            attempt += 1
+            if (max_attempts and attempt >= max_attempts) or time.monotonic() + delay >= deadline:
+                if error is not None:
+                    raise error
+                response.raise_for_status()
+            await asyncio.sleep(delay)
+
+    async def post_all(self, results, batch_endpoints: dict = None):
+        """
+        Posts every result (dicts with "endpoint" and "data") concurrently.
+
+        :param batch_endpoints: Optional map of endpoint -> batch URL accepting NDJSON. Results for those
+            endpoints are coalesced into requests of up to `max_batch_size` lines.
+        """
+        batch_endpoints = batch_endpoints or {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def limited(url, **kwargs):
+            async with semaphore:
+                return await self.post(url, **kwargs)
+
+        requests_to_send = []
+        batched = {}
+        for result in results:
+            if result["endpoint"] in batch_endpoints:
+                batched.setdefault(result["endpoint"], []).append(result["data"])
+            else:
+                requests_to_send.append(limited(result["endpoint"], json_body=result["data"]))
+
+        for endpoint, items in batched.items():
+            for start in range(0, len(items), self.max_batch_size):
+                body = "\n".join(json.dumps(item) for item in items[start:start + self.max_batch_size]) + "\n"
+                requests_to_send.append(limited(
+                    batch_endpoints[endpoint], data=body.encode("utf-8"),
+                    headers={"Content-Type": "application/x-ndjson"},
+                ))
+
+        return await asyncio.gather(*requests_to_send)
@@ -0,0 +1,214 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from converters.claim_check import BlobStore, S3BlobStore
+
+DEFAULT_CACHE_DIR = "/tmp/temporal-task-cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+
+def code_version(task_class) -> str:
+    """Hash of the task's source (plus an explicit `cache_version`), so editing a task invalidates its entries."""
+    try:
+        source = inspect.getsource(task_class)
+    except (OSError, TypeError):
+        source = task_class.__qualname__
+    version = f"{source}\0{getattr(task_class, 'cache_version', '')}"
+    return hashlib.sha256(version.encode()).hexdigest()[:16]
+
+
+def cache_key(task_class, inputs=None) -> str:
+    """Content address of one task execution: task class, code version and canonical JSON of its inputs."""
+    identity = {
+        "task": f"{task_class.__module__}:{task_class.__qualname__}",
+        "code": code_version(task_class),
+        "inputs": inputs,
+    }
+    encoded = json.dumps(identity, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class MemoCache:
+    """
+    Disk-backed LRU cache of task results with TTL and size-based eviction, optionally backed by a shared
+    remote tier (e.g. S3) that is consulted on a local miss and written through on every put.
+
+    Entries are written atomically as `pickle((expires_at, value))` files, and the LRU order is kept in
+    file mtimes so it survives worker restarts. Every cache error counts as a miss: the cache can make a
+    task faster but never make it fail.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS, remote: BlobStore = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.remote = remote
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self._total_bytes = 0
+        self._counters = {"hits": 0, "remote_hits": 0, "misses": 0, "puts": 0, "evictions": 0, "expired": 0,
+                          "errors": 0}
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _load_index(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                stat = os.stat(os.path.join(self.directory, name))
+                files.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries), "bytes": self._total_bytes}
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def get(self, key: str):
+        """:return: (hit, value)"""
+        try:
+            found, value = self._get_local(key)
+            if found:
+                self._count("hits")
+                return True, value
+            if self.remote is not None:
+                found, value = self._get_remote(key)
+                if found:
+                    self._count("remote_hits")
+                    return True, value
+        except Exception:
+            self._count("errors")
+        self._count("misses")
+        return False, None
+
+    def _get_local(self, key: str):
+        with self._lock:
+            if key not in self._entries:
+                return False, None
+            self._entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                expires_at, value = pickle.load(f)
+        except FileNotFoundError:
+            self._forget(key)
+            return False, None
+        if expires_at < time.time():
+            self._count("expired")
+            self._remove(key)
+            return False, None
+        os.utime(path)  # Persist the LRU position
+        return True, value
+
+    def _get_remote(self, key: str):
+        try:
+            data = self.remote.get(key)
+        except Exception:
+            return False, None  # Missing object (or unreachable tier) is a miss
+        expires_at, value = pickle.loads(data)
+        if expires_at < time.time():
+            return False, None
+        self._put_local(key, data)  # Promote to the local tier
+        return True, value
+
+    def put(self, key: str, value, ttl_seconds: float = None):
+        try:
+            expires_at = time.time() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+            data = pickle.dumps((expires_at, value), protocol=pickle.HIGHEST_PROTOCOL)
+            self._put_local(key, data)
+            if self.remote is not None:
+                self.remote.put(key, data)
+            self._count("puts")
+        except Exception:
+            self._count("errors")
+
+    def _put_local(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)  # Readers never see a partial entry
+
+        evicted = []
+        with self._lock:
+            self._total_bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            while self._total_bytes > self.max_bytes:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                self._counters["evictions"] += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._unlink(old_key)
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+
+    def _remove(self, key: str):
+        self._forget(key)
+        self._unlink(key)
+
+    def _unlink(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+def memo_cache_from_env():
+    """
+    Builds the cache from TASK_CACHE (on|off, default off), TASK_CACHE_DIR, TASK_CACHE_MAX_MB,
+    TASK_CACHE_TTL_SECONDS and, for the shared tier, TASK_CACHE_BUCKET / TASK_CACHE_PREFIX.
+    """
+    if os.getenv("TASK_CACHE", "off").lower() not in ("1", "on", "true"):
+        return None
+    bucket = os.getenv("TASK_CACHE_BUCKET")
+    return MemoCache(
+        directory=os.getenv("TASK_CACHE_DIR", DEFAULT_CACHE_DIR),
+        max_bytes=int(float(os.getenv("TASK_CACHE_MAX_MB", DEFAULT_MAX_BYTES / 1024 / 1024)) * 1024 * 1024),
+        ttl_seconds=float(os.getenv("TASK_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+        remote=S3BlobStore(bucket, os.getenv("TASK_CACHE_PREFIX", "task-cache/")) if bucket else None,
+    )
+
+
+# Process-wide cache used by BaseTask.run (None disables memoization)
+_memo_cache = None
+_memo_cache_loaded = False
+
+
+def get_memo_cache():
+    global _memo_cache, _memo_cache_loaded
+    if not _memo_cache_loaded:
+        _memo_cache = memo_cache_from_env()
+        _memo_cache_loaded = True
+    return _memo_cache
+
+
+def set_memo_cache(cache):
+    global _memo_cache, _memo_cache_loaded
+    _memo_cache = cache
+    _memo_cache_loaded = True
+
+
+def bypassed_tasks() -> set:
+    """Task names listed in TASK_CACHE_BYPASS (comma-separated) always run, without reading or writing the cache."""
+    return {name.strip() for name in os.getenv("TASK_CACHE_BYPASS", "").split(",") if name.strip()}
@@ -0,0 +1,64 @@
+import asyncio
+
+from temporalio import activity
+
+from converters.claim_check import offload
+
+PHASES = ("precheck", "preprocess", "process", "postprocess")
+
+# Execution modes for a phase
+FUSED = "fused"  # Runs with its neighbours inside one activity, checkpointed by heartbeat
+ACTIVITY = "activity"  # Its own activity, with its own timeout and retry policy
+LOCAL = "local"  # Local activity: runs in the worker that runs the workflow, no task-queue round-trip
+
+DEFAULT_TIMEOUT_SECONDS = {FUSED: 60, ACTIVITY: 60, LOCAL: 5}
+
+
+def phase_plan(phase_modes: dict) -> list:
+    """
+    Turns a task's `phase_modes` into the list of steps the workflow executes.
+
+    Consecutive fused phases collapse into one step, so a task with no `phase_modes` is a single fused step.
+
+    :param phase_modes: phase -> mode string, or a dict with "mode", "start_to_close_seconds" and "retry"
+        (see environment.retry_policies.retry_policy).
+    :return: [{"phases": [...], "mode": ..., "start_to_close_seconds": ..., "retry": {...}}, ...]
+    """
+    unknown = set(phase_modes) - set(PHASES)
+    if unknown:
+        raise ValueError(f"Unknown phases in phase_modes: {sorted(unknown)}")
+
+    steps = []
+    for phase in PHASES:
+        settings = phase_modes.get(phase, FUSED)
+        if isinstance(settings, str):
+            settings = {"mode": settings}
+        mode = settings.get("mode", FUSED)
+        if mode not in DEFAULT_TIMEOUT_SECONDS:
+            raise ValueError(f"Unknown execution mode {mode!r} for phase {phase}")
+
+        if mode == FUSED and steps and steps[-1]["mode"] == FUSED:
+            steps[-1]["phases"].append(phase)
+            continue
+        steps.append({
+            "phases": [phase],
+            "mode": mode,
+            "start_to_close_seconds": settings.get("start_to_close_seconds", DEFAULT_TIMEOUT_SECONDS[mode]),
+            "retry": settings.get("retry"),
+        })
+    return steps
+
+
+def phase_activity_name(task_name: str) -> str:
+    return f"{task_name}.phases"
+
+
+def phase_activity(task_class):
+    """Activity that runs some of `task_class`'s phases; registered next to the task's fused `run` activity."""
+
+    async def run_phases(phases: list, outputs: dict, inputs: dict = None) -> dict:
+        response = await task_class().run_phases(phases, outputs, inputs)
+        # The workflow unpacks the response, so large parts become claim checks one by one, not the whole dict
+        return {key: await asyncio.to_thread(offload, value) for key, value in response.items()}
+
+    return activity.defn(name=phase_activity_name(task_class.__name__))(run_phases)
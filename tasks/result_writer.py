@@ -1,13 +1,78 @@
+import os
 from abc import ABC, abstractmethod
 from temporalio import activity
 
+from write_behind import WriteBehindBuffer
+
 
 class ResultWriter(ABC):
     """Abstract mixin for writing results to different destinations."""
 
+    write_behind = None  # WriteBehindBuffer shared by every activity of this writer in the worker process
+    transactional_flush = False  # A failed _flush_batch wrote nothing, so its requests may be retried one by one
+
+    # DAG scheduling (see dag.TaskGraph): writers that must finish first, and the concurrency bucket to count against
+    depends_on = ()
+    resource_class = "default"
+
     @abstractmethod
-    async def write(self, data):
-        pass
+    async def write(self, data, load_key: str = None):
+        """
+        :param load_key: Id of this logical write, unique per workflow, segment and writer and the same on
+            every retry or replay (see DynamicWorkflow.run_segment); writers that resume partial loads key
+            their state on it.
+        """
+
+    @classmethod
+    def supports_write_behind(cls) -> bool:
+        return cls._flush_batch is not ResultWriter._flush_batch
+
+    @classmethod
+    def enable_write_behind(cls, **settings):
+        """Coalesces writes from concurrent activities; `settings` are WriteBehindBuffer flush/back-pressure limits."""
+        if not cls.supports_write_behind():
+            raise TypeError(f"{cls.__name__} has no _flush_batch, so it cannot use write-behind")
+        settings.setdefault("isolate_failures", cls.transactional_flush)
+        if settings["isolate_failures"] and not cls.transactional_flush:
+            raise ValueError(f"{cls.__name__} flushes are not transactional; isolating failures would repeat writes")
+        cls.write_behind = WriteBehindBuffer(cls()._flush_batch, **settings)
+
+    async def _flush_batch(self, items: list):
+        """Writes items gathered from many activities in one go (used by write-behind mode)."""
+        raise NotImplementedError
+
+
+def enable_write_behind_from_env(writer_classes) -> list:
+    """
+    Turns on write-behind for the writers named in TASK_WRITE_BEHIND (comma-separated class names, or "all"
+    for every writer that supports it), with limits from TASK_WRITE_BEHIND_MAX_BATCH_ITEMS,
+    TASK_WRITE_BEHIND_MAX_DELAY_MS and TASK_WRITE_BEHIND_MAX_PENDING_ITEMS. Returns the enabled classes.
+    """
+    names = {name.strip() for name in os.getenv("TASK_WRITE_BEHIND", "").split(",") if name.strip()}
+    if not names:
+        return []
+    settings = {}
+    if os.getenv("TASK_WRITE_BEHIND_MAX_BATCH_ITEMS"):
+        settings["max_batch_items"] = int(os.environ["TASK_WRITE_BEHIND_MAX_BATCH_ITEMS"])
+    if os.getenv("TASK_WRITE_BEHIND_MAX_DELAY_MS"):
+        settings["max_delay_seconds"] = int(os.environ["TASK_WRITE_BEHIND_MAX_DELAY_MS"]) / 1000
+    if os.getenv("TASK_WRITE_BEHIND_MAX_PENDING_ITEMS"):
+        settings["max_pending_items"] = int(os.environ["TASK_WRITE_BEHIND_MAX_PENDING_ITEMS"])
+
+    enabled = []
+    for writer_class in writer_classes:
+        if ("all" in names and writer_class.supports_write_behind()) or writer_class.__name__ in names:
+            writer_class.enable_write_behind(**settings)
+            enabled.append(writer_class)
+    return enabled
+
+
+async def close_write_behind(writer_classes):
+    """Flushes and stops the write-behind buffers of `writer_classes` (call after the worker has drained)."""
+    for writer_class in writer_classes:
+        if writer_class.write_behind is not None:
+            await writer_class.write_behind.close()
+            writer_class.write_behind = None
 
 
 class S3ResultWriter(ResultWriter):
@@ -37,35 +102,60 @@ class APIResultWriter(ResultWriter):
         return "API Write Successful"
 
 
-import boto3
-import requests
+import asyncio
+import json
+import uuid
+
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from temporalio import activity
 
-# 🔹 Define DB engine & session
+from converters.claim_check import resolve
+from engine_registry import get_engine
+from http_transport import HTTPTransport
+from s3_uploader import S3UploadEngine
+
+# 🔹 Define DB engine & session (pooled engine shared by the whole worker process)
 DATABASE_URL = "postgresql://user:password@db_host/db_name"
-engine = create_engine(DATABASE_URL)
+engine = get_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 class S3ResultWriter(ResultWriter):
-    """Writes results to S3 in a batch."""
-    s3_client = boto3.client("s3")
+    """Writes results to S3 in a batch, uploading concurrently off the event loop."""
+    bucket = "my-bucket"
+    combined_prefix = "write-behind/"
+    upload_engine = S3UploadEngine(max_concurrency=16)
 
     @activity.defn(name="S3ResultWriter")
-    async def write(self, results):
-        for result in results:
-            self.s3_client.put_object(Bucket="my-bucket", Key=result["key"], Body=result["data"])
+    async def write(self, results, load_key: str = None):
+        results = [resolve(result) for result in resolve(results)]  # Fetch offloaded (claim-check) payloads
+        if self.write_behind is not None:
+            return await self.write_behind.submit(results)
+
+        # 🔹 Keys finished by a previous attempt are carried in the heartbeat details
+        details = activity.info().heartbeat_details
+        uploaded_keys = set(details[0]) if details else set()
+
+        def on_complete(key):
+            uploaded_keys.add(key)
+            activity.heartbeat(sorted(uploaded_keys))
+
+        await self.upload_engine.upload_all(self.bucket, results, skip_keys=uploaded_keys, on_complete=on_complete)
+        return "S3 Write Successful"
+
+    async def _flush_batch(self, results: list):
+        # One combined NDJSON object per flush instead of one PUT per result
+        body = "".join(json.dumps({"key": result["key"], "data": result["data"]}) + "\n" for result in results)
+        await self.upload_engine.upload(self.bucket, f"{self.combined_prefix}{uuid.uuid4()}.ndjson", body)
         return "S3 Write Successful"
 
 class APIResultWriter(ResultWriter):
     """Sends results to an API in a batch."""
+    transport = HTTPTransport()
 
     @activity.defn(name="APIResultWriter")
     async def write(self, results):
-        for result in results:
-            response = requests.post(result["endpoint"], json=result["data"])
-            response.raise_for_status()
+        await self.transport.post_all(results)
         return "API Write Successful"
 
 class DBResultWriter(ResultWriter):
@@ -86,49 +176,56 @@ class DBResultWriter(ResultWriter):
             session.close()
 
 
+from datetime import timedelta
+
 from temporalio.common import RetryPolicy
-import requests
 from temporalio import activity
 
 class APIResultWriter(ResultWriter):
-    """Sends results to an API in a batch."""
-
-    @activity.defn(name="APIResultWriter")
-    async def write(self, results):
-        retry_policy = RetryPolicy(
-            initial_interval=5,  # Wait 5 seconds before first retry
+    """Sends results to an API in a batch, retrying each post with jittered backoff."""
+    transport = HTTPTransport(
+        max_concurrency=32,
+        retry_policy=RetryPolicy(
+            initial_interval=timedelta(seconds=5),  # Wait ~5 seconds before first retry
             backoff_coefficient=2,  # Exponential backoff
-            maximum_interval=60,  # Max wait time of 60 seconds
-            maximum_attempts=5  # Fail after 5 retries
-        )
+            maximum_interval=timedelta(seconds=60),  # Max wait time of 60 seconds
+            maximum_attempts=5  # Fail after 5 attempts
+        ),
+    )
+    batch_endpoints = {}  # endpoint -> NDJSON batch URL, for endpoints that accept coalesced posts
+    depends_on = ("S3ResultWriter",)  # Keep S3 → API → DB ordering
 
-        for result in results:
-            for attempt in range(retry_policy.maximum_attempts):
-                try:
-                    response = requests.post(result["endpoint"], json=result["data"])
-                    response.raise_for_status()
-                    break  # ✅ Success, move to next result
-                except requests.exceptions.RequestException as e:
-                    if attempt == retry_policy.maximum_attempts - 1:
-                        raise e  # ❌ Give up after 5 failed attempts
-                    await asyncio.sleep(min(retry_policy.initial_interval * (2 ** attempt), retry_policy.maximum_interval))
+    @activity.defn(name="APIResultWriter")
+    async def write(self, results, load_key: str = None):
+        results = [resolve(result) for result in resolve(results)]
+        if self.write_behind is not None:
+            return await self.write_behind.submit(results)
+        return await self._flush_batch(results)
+
+    async def _flush_batch(self, results: list):
+        await self.transport.post_all(results, batch_endpoints=self.batch_endpoints)
         return "API Write Successful"
 
 
 import pandas as pd
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import create_engine
 from temporalio import activity
 
+from bulk_loader import DEFAULT_CHUNK_SIZE, bulk_load
+from models import Base
+
 # 🔹 Define SQLAlchemy session
 DATABASE_URL = "postgresql://user:password@db_host/db_name"
-engine = create_engine(DATABASE_URL)
+engine = get_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 class DBResultWriter:
     """Writes multiple Pandas DataFrames to their respective tables in a single transaction."""
 
+    use_bulk_loader = True  # Stream via COPY (PostgreSQL) / chunked executemany instead of row dicts
+    bulk_chunk_size = DEFAULT_CHUNK_SIZE
+
     @activity.defn(name="DBResultWriter")
     async def write(self, table_data_map: dict):
         """
@@ -137,8 +234,18 @@ class DBResultWriter:
         :param table_data_map: Dictionary where keys are ORM model classes and values are Pandas DataFrames.
         :type table_data_map: dict
         """
+        table_data_map = resolve(table_data_map)
+        # The load and commit block, so they run off the worker's event loop
+        return await asyncio.to_thread(self._write_tables, table_data_map)
+
+    def _write_tables(self, table_data_map: dict):
         session = SessionLocal()
         try:
+            if self.use_bulk_loader:
+                bulk_load(session, table_data_map, chunk_size=self.bulk_chunk_size, metadata=Base.metadata)
+                session.commit()  # ✅ One commit covers every table in the map
+                return "DB Write Successful"
+
             for model_class, df in table_data_map.items():
                 if not isinstance(df, pd.DataFrame):
                     raise ValueError(f"Expected a Pandas DataFrame for {model_class.__tablename__}, got {type(df)}")
@@ -161,42 +268,109 @@ class DBResultWriter:
 
 
 
-import boto3
+import contextvars
+
 import pandas as pd
+from sqlalchemy.exc import DataError, IntegrityError
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
 from temporalio import activity
+from temporalio.exceptions import ApplicationError
 
-class DBResultWriter:
+from engine_registry import get_iam_engine
+from staged_loader import DEFAULT_COMMIT_CHUNK_SIZE, StagedLoader, staging_token
+
+class DBResultWriter(ResultWriter):
     """Writes multiple Pandas DataFrames to their respective tables in a single transaction with AWS IAM authentication."""
 
+    rds_host = "your-rds-instance.us-east-1.rds.amazonaws.com"
+    rds_port = 5432
+    db_user = "your-db-user"
+    db_name = "your-database"
+    depends_on = ("APIResultWriter",)
+    transactional_flush = True  # _flush_batch writes every table in one transaction
+
+    use_bulk_loader = True
+    bulk_chunk_size = DEFAULT_CHUNK_SIZE
+
+    # Opt-in for very large loads: commit to staging in chunks, resume on retry, publish atomically at the end
+    chunked_commit = False
+    commit_chunk_size = DEFAULT_COMMIT_CHUNK_SIZE
+
     @activity.defn(name="DBResultWriter")
-    async def write(self, table_data_map: dict):
+    async def write(self, table_data_map: dict, load_key: str = None):
         """
         Writes multiple Pandas DataFrames to AWS RDS using IAM-based authentication.
 
         :param table_data_map: Dictionary where keys are ORM models and values are Pandas DataFrames.
+        :param load_key: Names the staging tables of a chunked-commit load (see ResultWriter.write).
         """
-        # 🔹 Fetch IAM authentication token from AWS RDS
-        session = boto3.Session()
-        rds_client = session.client("rds")
-        rds_host = "your-rds-instance.us-east-1.rds.amazonaws.com"
-        db_user = "your-db-user"
+        table_data_map = resolve(table_data_map)
+        if self.chunked_commit:
+            return await self._write_tables_staged(table_data_map, load_key)
+        if self.write_behind is not None:
+            return await self.write_behind.submit([table_data_map])
+        return await asyncio.to_thread(self._write_tables, table_data_map)
+
+    async def _write_tables_staged(self, table_data_map: dict, load_key: str = None):
+        info = activity.info()
+        details = info.heartbeat_details
+        checkpoint = details[0] if details else {}
+
+        engine = get_iam_engine(self.rds_host, self.db_user, self.db_name, port=self.rds_port)
+        # Same token on every retry of this load, so the retry finds the staging tables of the last attempt.
+        # Without a workflow-supplied key, fall back to this run's activity: activity ids restart at 1 after
+        # continue-as-new, so the workflow id alone would collide with an earlier, published load
+        loader = StagedLoader(
+            engine, staging_token(load_key or f"{info.workflow_id}/{info.workflow_run_id}/{info.activity_id}"),
+            metadata=Base.metadata, commit_chunk_size=self.commit_chunk_size, copy_chunk_size=self.bulk_chunk_size,
+        )
+
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()  # Heartbeats must be sent from the loop, in the activity context
+
+        def on_chunk(rows_committed):
+            loop.call_soon_threadsafe(activity.heartbeat, {"rows": dict(rows_committed)}, context=context)
+
+        def load_and_publish():
+            if loader.is_published():
+                # A previous attempt published but its completion was lost; drop anything staged since
+                loader.discard(table_data_map)
+                return "DB Write Successful"
+            try:
+                loader.load(table_data_map, checkpoint.get("rows"), on_chunk=on_chunk)
+                loader.publish(table_data_map)  # Drops the staging tables in the publishing transaction
+            except (ValueError, IntegrityError, DataError) as e:
+                # ❌ Bad frames or rows fail every retry the same way: no retry will resume this staging
+                loader.discard(table_data_map)
+                raise ApplicationError(str(e), type="InvalidTableData", non_retryable=True) from e
+            return "DB Write Successful"
+
+        return await asyncio.to_thread(load_and_publish)
 
-        token = rds_client.generate_db_auth_token(DBHostname=rds_host, Port=5432, DBUsername=db_user)
+    async def _flush_batch(self, table_data_maps: list):
+        # Frames for the same table from many activities are concatenated and written in one transaction
+        frames_by_table = {}
+        for table_data_map in table_data_maps:
+            for table_key, df in table_data_map.items():
+                frames_by_table.setdefault(table_key, []).append(df)
+        merged = {table_key: pd.concat(frames, ignore_index=True) for table_key, frames in frames_by_table.items()}
+        return await asyncio.to_thread(self._write_tables, merged)
 
-        # 🔹 Create SQLAlchemy Engine with IAM Authentication
-        DATABASE_URL = f"postgresql://{db_user}:{token}@{rds_host}:5432/your-database"
-        engine = create_engine(DATABASE_URL)
+    def _write_tables(self, table_data_map: dict):
+        # 🔹 Reuse the worker-wide pooled engine; IAM tokens are cached and refreshed in the background
+        engine = get_iam_engine(self.rds_host, self.db_user, self.db_name, port=self.rds_port)
 
         # 🔹 SQLAlchemy Session
         SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
         session = SessionLocal()
 
         try:
-            for model_class, df in table_data_map.items():
-                records = df.to_dict(orient="records")
-                session.bulk_insert_mappings(model_class, records)
+            if self.use_bulk_loader:
+                bulk_load(session, table_data_map, chunk_size=self.bulk_chunk_size, metadata=Base.metadata)
+            else:
+                for model_class, df in table_data_map.items():
+                    records = df.to_dict(orient="records")
+                    session.bulk_insert_mappings(model_class, records)
 
             session.commit()  # Commit transaction only after all inserts
             return "DB Write Successful"
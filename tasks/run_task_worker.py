@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+from converters.claim_check import ClaimCheckInterceptor, blob_store_from_env, release_claim_checks, \
+    release_workflow_claim_checks, set_blob_store
+from dynamic_workflow import DynamicWorkflow
+from engine_registry import dispose_all
+from memo_cache import get_memo_cache
+from phases import phase_activity
+from environment.temporal_client import connect_client
+from environment.worker_launcher import launch_worker, wait_for_shutdown
+from result_writer import (APIResultWriter, DBResultWriter, S3ResultWriter, close_write_behind,
+                           enable_write_behind_from_env)
+from task_registry import build_registry, load_task_classes
+from task_results import record_task_results
+
+
+async def main():
+    # 🔹 One claim-check store: the client's codec offloads to it, result writers and cleanup read from it
+    blob_store = blob_store_from_env()
+    set_blob_store(blob_store)
+    client = await connect_client(blob_store=blob_store)
+
+    # 🔹 Build the task registry once per worker process (served from the on-disk cache when unchanged)
+    start = time.perf_counter()
+    task_specs = build_registry()
+    task_classes = load_task_classes(task_specs)
+    print(f"Task registry ready: {len(task_classes)} tasks in {time.perf_counter() - start:.3f}s")
+
+    cache = get_memo_cache()
+    if cache is not None:
+        print(f"Task result cache enabled at {cache.directory}: {cache.stats()}")
+
+    # 🔹 Optional write-behind: coalesce writes from concurrent activities (TASK_WRITE_BEHIND=S3ResultWriter,...)
+    writer_classes = [S3ResultWriter, APIResultWriter, DBResultWriter]
+    write_behind = enable_write_behind_from_env(writer_classes)
+    if write_behind:
+        print(f"Write-behind enabled for {[writer_class.__name__ for writer_class in write_behind]}")
+
+    worker = launch_worker(
+        client,
+        task_queue="dynamic-task-queue",
+        workflows=[DynamicWorkflow],
+        activities=[
+            *(task_class().run for task_class in task_classes.values()),
+            # Per-phase activities (also used as local activities) for tasks that split their phases
+            *(phase_activity(task_class) for task_class in task_classes.values() if task_class.phase_modes),
+            S3ResultWriter().write,
+            APIResultWriter().write,
+            DBResultWriter().write,
+            release_claim_checks,
+            release_workflow_claim_checks,
+            record_task_results,
+        ],
+        interceptors=[ClaimCheckInterceptor()],  # Activities get the values behind claim-check arguments
+    )
+
+    try:
+        async with worker:
+            print("Worker started, listening for task workflows...")
+            await wait_for_shutdown()
+    finally:
+        await close_write_behind(write_behind)  # The worker has drained: flush what its activities buffered
+        # Then release what the writers hold: upload/post threads, HTTP sessions, pooled DB connections
+        S3ResultWriter.upload_engine.close()
+        APIResultWriter.transport.close()
+        dispose_all()
+        if cache is not None:
+            print(f"Task result cache: {cache.stats()}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
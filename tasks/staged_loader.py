@@ -0,0 +1,121 @@
+import hashlib
+
+import pandas as pd
+from sqlalchemy import Column, DateTime, MetaData, String, Table, func, select
+
+from bulk_loader import DEFAULT_CHUNK_SIZE, iter_chunks, load_dataframe, resolve_table
+
+DEFAULT_COMMIT_CHUNK_SIZE = 500_000
+
+
+# Records published loads in the same transaction as the publish, so a retry after a lost completion
+# never publishes the same rows twice
+load_journal = Table(
+    "staged_load_journal",
+    MetaData(),
+    Column("token", String(32), primary_key=True),
+    Column("published_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def staging_token(load_key: str) -> str:
+    """
+    Stable token for one logical load, identical across activity retries. `load_key` must be unique per load
+    and stable across retries and replays, e.g. workflow id + segment + writer (not the activity id, which
+    restarts after continue-as-new).
+    """
+    return hashlib.sha256(load_key.encode()).hexdigest()[:12]
+
+
+def staging_table(table: Table, token: str) -> Table:
+    """Constraint-free copy of `table`'s columns used to accumulate committed chunks before publishing."""
+    return Table(
+        f"{table.name}__stg_{token}",
+        MetaData(),
+        *(Column(column.name, column.type) for column in table.columns),
+        schema=table.schema,
+    )
+
+
+class StagedLoader:
+    """
+    Loads DataFrames into per-load staging tables in separately committed chunks, then publishes atomically.
+
+    Progress survives a crash: the rows already in each staging table are the checkpoint, so a retried load
+    skips them. Targets only change in `publish()`, which copies every staging table into its target, drops
+    the staging tables and journals the token in one transaction, so readers still see all-or-nothing.
+    """
+
+    def __init__(self, engine, token: str, metadata=None, commit_chunk_size: int = DEFAULT_COMMIT_CHUNK_SIZE,
+                 copy_chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.engine = engine
+        self.token = token
+        self.metadata = metadata
+        self.commit_chunk_size = commit_chunk_size
+        self.copy_chunk_size = copy_chunk_size
+
+    def is_published(self) -> bool:
+        with self.engine.begin() as connection:
+            load_journal.create(connection, checkfirst=True)
+            return connection.execute(
+                select(load_journal.c.token).where(load_journal.c.token == self.token)
+            ).first() is not None
+
+    def load(self, table_data_map: dict, checkpoint: dict = None, on_chunk=None) -> dict:
+        """
+        Stages every DataFrame, resuming after the rows a previous attempt already committed.
+
+        :param checkpoint: Last heartbeat checkpoint (table name -> rows committed). The staging row counts
+            are authoritative and override it, e.g. when a chunk committed but its heartbeat was lost.
+        :param on_chunk: Callback invoked with the updated checkpoint after each committed chunk.
+        :return: Checkpoint with the rows committed per table.
+        """
+        checkpoint = dict(checkpoint or {})
+        for key, df in table_data_map.items():
+            if not isinstance(df, pd.DataFrame):
+                raise ValueError(f"Expected a Pandas DataFrame for {key}, got {type(df)}")
+            target = resolve_table(key, self.metadata)
+            staging = staging_table(target, self.token)
+
+            with self.engine.begin() as connection:
+                staging.create(connection, checkfirst=True)
+                committed = connection.execute(select(func.count()).select_from(staging)).scalar_one()
+            checkpoint[target.name] = committed
+
+            remaining = df.iloc[committed:]
+            for chunk in iter_chunks(remaining, self.commit_chunk_size):
+                with self.engine.begin() as connection:  # ✅ Each chunk is its own committed transaction
+                    load_dataframe(connection, staging, chunk, self.copy_chunk_size)
+                committed += len(chunk)
+                checkpoint[target.name] = committed
+                if on_chunk is not None:
+                    on_chunk(checkpoint)
+
+        return checkpoint
+
+    def publish(self, table_data_map: dict) -> dict:
+        """Moves all staged rows into their target tables and drops staging, in a single transaction."""
+        published = {}
+        with self.engine.begin() as connection:
+            load_journal.create(connection, checkfirst=True)
+            for key, df in table_data_map.items():
+                target = resolve_table(key, self.metadata)
+                staging = staging_table(target, self.token)
+                columns = [target.c[str(column)] for column in df.columns]
+                result = connection.execute(
+                    target.insert().from_select(columns, select(*(staging.c[c.name] for c in columns)))
+                )
+                published[target.name] = result.rowcount
+                staging.drop(connection)
+            connection.execute(load_journal.insert().values(token=self.token))
+        return published
+
+    def discard(self, table_data_map: dict):
+        """Drops this load's staging tables without publishing, once no retry will resume them."""
+        with self.engine.begin() as connection:
+            for key in table_data_map:
+                try:
+                    target = resolve_table(key, self.metadata)
+                except ValueError:
+                    continue  # Never staged
+                staging_table(target, self.token).drop(connection, checkfirst=True)
@@ -1,14 +1,23 @@
-from temporalio.client import Client
 import asyncio
 import uuid
 
+from environment.temporal_client import connect_client
+from task_registry import build_registry
+
 async def main():
-    client = await Client.connect("localhost:7233")
+    client = await connect_client()
 
     workflow_id = f"dynamic-workflow-{uuid.uuid4()}"
 
+    # The task list is deterministic workflow input, built from the manifest (cached on disk)
+    task_specs = build_registry()
+
+    # Ready tasks run concurrently; "continue" keeps independent branches going when a task fails
+    options = {"max_concurrency": 8, "resource_limits": {}, "failure_policy": "fail_fast"}
+
     result = await client.start_workflow(
         "DynamicWorkflow",
+        args=[task_specs, options],
         id=workflow_id,
         task_queue="dynamic-task-queue",
     )
@@ -0,0 +1,155 @@
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import tempfile
+from importlib.metadata import entry_points
+
+from phases import phase_plan
+
+# 🔹 Explicit manifest of BaseTask implementations ("module:ClassName")
+TASK_MANIFEST = [
+    "base_task:DataProcessingTask",
+    "base_task:APITask",
+    "base_task:APITask1",
+    "base_task:DBTask1",
+]
+
+# Installed plugins can contribute tasks under this entry-point group
+ENTRY_POINT_GROUP = "temporal_experiments.tasks"
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".task_registry_cache.json")
+
+WRITER_NAMES = ("S3ResultWriter", "APIResultWriter", "DBResultWriter")
+
+# Writers are scheduled as DAG nodes too, so their declared dependencies travel with the task specs
+WRITER_MANIFEST = [f"result_writer:{name}" for name in WRITER_NAMES]
+
+
+def plugin_entries() -> list:
+    return [ep.value for ep in entry_points(group=ENTRY_POINT_GROUP)]
+
+
+def _module_file(module_name: str) -> str:
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or spec.origin is None:
+        raise ImportError(f"Cannot locate task module {module_name}")
+    return spec.origin
+
+
+def _file_state(path: str, previous: dict = None) -> dict:
+    """mtime/size of a module file, plus a content hash (re-hashed only when mtime or size moved)."""
+    stat = os.stat(path)
+    state = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    if previous and previous.get("mtime_ns") == state["mtime_ns"] and previous.get("size") == state["size"]:
+        state["sha256"] = previous["sha256"]
+    else:
+        with open(path, "rb") as f:
+            state["sha256"] = hashlib.sha256(f.read()).hexdigest()
+    return state
+
+
+def describe_task(task_class) -> dict:
+    """Serializable description of a task class: everything the workflow needs, without the class itself."""
+    writer = next((base.__name__ for base in task_class.__mro__ if base.__name__ in WRITER_NAMES), None)
+    activity_definition = getattr(task_class.run, "__temporal_activity_definition", None)
+    return {
+        "name": task_class.__name__,
+        "kind": "task",
+        "module": task_class.__module__,
+        "qualname": task_class.__qualname__,
+        "activity": activity_definition.name if activity_definition else task_class.__name__,
+        "writer": writer,
+        "depends_on": list(getattr(task_class, "depends_on", ())),
+        "resource_class": getattr(task_class, "resource_class", "default"),
+        # None: the whole task runs as its fused `run` activity
+        "phase_plan": phase_plan(task_class.phase_modes) if getattr(task_class, "phase_modes", None) else None,
+    }
+
+
+def describe_writer(writer_class) -> dict:
+    activity_definition = getattr(writer_class.write, "__temporal_activity_definition", None)
+    return {
+        "name": writer_class.__name__,
+        "kind": "writer",
+        "module": writer_class.__module__,
+        "qualname": writer_class.__qualname__,
+        "activity": activity_definition.name if activity_definition else writer_class.__name__,
+        "depends_on": list(writer_class.depends_on),
+        "resource_class": writer_class.resource_class,
+    }
+
+
+def _load_cache(cache_path: str) -> dict:
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_registry(manifest=None, cache_path: str = DEFAULT_CACHE_PATH, use_entry_points: bool = True) -> list:
+    """
+    Builds the task registry once at worker startup (or in a starter) and returns a list of task specs,
+    followed by one spec per result writer (`"kind": "writer"`).
+
+    The result is cached on disk and reused while the manifest entries and every task module's contents are
+    unchanged; a touched-but-identical file is recognized by its content hash.
+    """
+    entries = list(manifest if manifest is not None else TASK_MANIFEST)
+    if use_entry_points:
+        entries += plugin_entries()
+    task_count = len(entries)
+    entries += WRITER_MANIFEST
+
+    cache = _load_cache(cache_path) if cache_path else {}
+    previous_files = cache.get("files", {}) if cache.get("entries") == entries else {}
+    module_names = sorted({entry.split(":", 1)[0] for entry in entries})
+    files = {name: _file_state(_module_file(name), previous_files.get(name)) for name in module_names}
+
+    if cache.get("entries") == entries and all(
+            cache.get("files", {}).get(name, {}).get("sha256") == state["sha256"] for name, state in files.items()
+    ):
+        specs = cache["tasks"]
+    else:
+        specs = [describe_task(_import_entry(entry)) for entry in entries[:task_count]]
+        specs += [describe_writer(_import_entry(entry)) for entry in entries[task_count:]]
+
+    if cache_path and (cache.get("files") != files or cache.get("tasks") != specs):
+        _write_cache(cache_path, {"entries": entries, "files": files, "tasks": specs})
+
+    return specs
+
+
+def _write_cache(cache_path: str, cache: dict):
+    """
+    Atomically replaces the cache file. Supervisor children rebuild it concurrently, so each writes its own
+    temp file; whichever replace lands last wins, and a cache that can't be written is simply skipped.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _import_entry(entry: str):
+    module_name, _, qualname = entry.partition(":")
+    target = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return target
+
+
+def load_task_classes(specs: list) -> dict:
+    """Imports the task classes behind the specs (worker side only, for activity registration)."""
+    return {
+        spec["name"]: _import_entry(f"{spec['module']}:{spec['qualname']}")
+        for spec in specs if spec.get("kind", "task") == "task"
+    }
@@ -0,0 +1,50 @@
+import asyncio
+import json
+import os
+
+from temporalio import activity
+
+from converters.claim_check import BlobStore, LocalBlobStore, S3BlobStore
+
+
+def result_store_from_env() -> BlobStore:
+    """Builds the per-task result store from TASK_RESULTS_STORE (local|s3), TASK_RESULTS_PATH and TASK_RESULTS_BUCKET."""
+    if os.getenv("TASK_RESULTS_STORE", "local").lower() == "s3":
+        return S3BlobStore(os.environ["TASK_RESULTS_BUCKET"], os.getenv("TASK_RESULTS_PREFIX", "task-results/"))
+    return LocalBlobStore(os.getenv("TASK_RESULTS_PATH", "/tmp/temporal-task-results"))
+
+
+_result_store = None
+
+
+def get_result_store() -> BlobStore:
+    global _result_store
+    if _result_store is None:
+        _result_store = result_store_from_env()
+    return _result_store
+
+
+def segment_key(workflow_id: str, segment: int) -> str:
+    return f"{workflow_id}.segment-{segment:05d}.json"
+
+
+@activity.defn(name="record_task_results")
+async def record_task_results(workflow_id: str, segment: int, entries: list) -> str:
+    """
+    Stores one segment's per-task results outside workflow history and returns the key.
+
+    Keyed by workflow id and segment number, so a retried activity overwrites its own segment.
+    """
+    key = segment_key(workflow_id, segment)
+    data = json.dumps(entries, default=str).encode()
+    await asyncio.to_thread(get_result_store().put, key, data)
+    return key
+
+
+def read_task_results(workflow_id: str, segments: int, store: BlobStore = None) -> list:
+    """All per-task results of a workflow (`segments` is the count reported in its summary)."""
+    store = store or get_result_store()
+    entries = []
+    for segment in range(segments):
+        entries.extend(json.loads(store.get(segment_key(workflow_id, segment))))
+    return entries
@@ -0,0 +1,70 @@
+# Run from tasks/, like the worker, so the flat imports resolve: python -m pytest test_s3_uploader.py
+import asyncio
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from s3_uploader import MB, S3UploadEngine
+
+BUCKET = "results"
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def stored_keys(s3_client) -> set:
+    return {obj["Key"] for obj in s3_client.list_objects_v2(Bucket=BUCKET).get("Contents", [])}
+
+
+def test_concurrent_puts(s3_client):
+    engine = S3UploadEngine(s3_client, max_concurrency=4, max_part_concurrency=2)
+    objects = [{"key": f"result/{i}.json", "data": f'{{"i": {i}}}'} for i in range(20)]
+    completed = []
+    try:
+        uploaded = asyncio.run(engine.upload_all(BUCKET, objects, on_complete=completed.append))
+    finally:
+        engine.close()
+
+    assert uploaded == [obj["key"] for obj in objects]
+    assert sorted(completed) == sorted(uploaded)
+    assert stored_keys(s3_client) == set(uploaded)
+    assert s3_client.get_object(Bucket=BUCKET, Key="result/7.json")["Body"].read() == b'{"i": 7}'
+
+
+def test_multipart_above_threshold(s3_client):
+    engine = S3UploadEngine(s3_client, multipart_threshold=5 * MB, part_size=5 * MB)
+    body = bytes(range(256)) * (11 * MB // 256)  # 3 parts: 5 MB, 5 MB, 1 MB
+    try:
+        asyncio.run(engine.upload(BUCKET, "large.bin", body))
+        asyncio.run(engine.upload(BUCKET, "small.bin", b"x" * 1024))
+    finally:
+        engine.close()
+
+    assert s3_client.get_object(Bucket=BUCKET, Key="large.bin")["Body"].read() == body
+    assert s3_client.head_object(Bucket=BUCKET, Key="large.bin")["ETag"].strip('"').endswith("-3")
+    assert "-" not in s3_client.head_object(Bucket=BUCKET, Key="small.bin")["ETag"]
+    assert s3_client.list_multipart_uploads(Bucket=BUCKET).get("Uploads", []) == []
+
+
+def test_retry_skips_completed_keys(s3_client):
+    engine = S3UploadEngine(s3_client)
+    objects = [{"key": f"result/{i}.json", "data": "retry"} for i in range(5)]
+    s3_client.put_object(Bucket=BUCKET, Key="result/0.json", Body=b"first attempt")
+    s3_client.put_object(Bucket=BUCKET, Key="result/3.json", Body=b"first attempt")
+    try:
+        uploaded = asyncio.run(engine.upload_all(BUCKET, objects, skip_keys=["result/0.json", "result/3.json"]))
+    finally:
+        engine.close()
+
+    assert uploaded == ["result/1.json", "result/2.json", "result/4.json"]
+    assert s3_client.get_object(Bucket=BUCKET, Key="result/0.json")["Body"].read() == b"first attempt"
+    assert stored_keys(s3_client) == {obj["key"] for obj in objects}
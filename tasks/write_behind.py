@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    Worker-side buffer that coalesces write requests from many concurrent activities into batched flushes.
+
+    A batch is flushed once it holds `max_batch_items` items or `max_delay_seconds` after its first request,
+    whichever comes first. Every caller awaits its own result. If a batched flush fails, every request in it
+    fails, unless `isolate_failures` is set: then the requests are flushed again one by one so only the bad
+    ones fail. Only set it for transactional flushes (a failed flush wrote nothing); a partly applied
+    non-idempotent flush (e.g. API posts) would be sent twice.
+    Callers wait (back-pressure) while more than `max_pending_items` items are buffered or in flight.
+    Call `close()` on worker shutdown to flush what is buffered and wait for in-flight flushes.
+    """
+
+    def __init__(self, flush_fn, max_batch_items: int = 1000, max_delay_seconds: float = 0.05,
+                 max_pending_items: int = 10_000, max_concurrent_flushes: int = 2, isolate_failures: bool = False):
+        self.flush_fn = flush_fn
+        self.max_batch_items = max_batch_items
+        self.max_delay_seconds = max_delay_seconds
+        self.max_pending_items = max_pending_items
+        self.isolate_failures = isolate_failures
+        self._flush_slots = asyncio.Semaphore(max_concurrent_flushes)
+        self._requests = []  # (items, future)
+        self._buffered_items = 0
+        self._pending_items = 0
+        self._capacity = asyncio.Condition()
+        self._batch_full = asyncio.Event()
+        self._has_requests = asyncio.Event()
+        self._flusher = None
+        self._flush_tasks = set()  # Strong references: the loop only keeps weak ones to running tasks
+        self._closed = False
+
+    async def submit(self, items: list):
+        """Buffers `items` and returns the result of the flush that wrote them (or raises its error)."""
+        if self._closed:
+            raise RuntimeError("Write-behind buffer is closed")
+        size = len(items)
+        async with self._capacity:
+            # An oversized request is still admitted when nothing else is pending
+            await self._capacity.wait_for(
+                lambda: self._pending_items == 0 or self._pending_items + size <= self.max_pending_items
+            )
+            self._pending_items += size
+
+        future = asyncio.get_running_loop().create_future()
+        self._requests.append((items, future))
+        self._buffered_items += size
+        self._has_requests.set()
+        if self._buffered_items >= self.max_batch_items:
+            self._batch_full.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+        try:
+            return await future
+        finally:
+            async with self._capacity:
+                self._pending_items -= size
+                self._capacity.notify_all()
+
+    async def _flush_loop(self):
+        while True:
+            await self._has_requests.wait()
+            deadline = time.monotonic() + self.max_delay_seconds
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+
+            # Take the slot before the batch, so cancelling the loop never drops a batch it has taken
+            await self._flush_slots.acquire()
+            batch = self._take_batch()
+            if batch:
+                self._start_flush(batch)
+            else:
+                self._flush_slots.release()
+            if not self._requests:
+                self._has_requests.clear()
+            if self._buffered_items < self.max_batch_items:
+                self._batch_full.clear()
+
+    def _start_flush(self, batch: list):
+        task = asyncio.create_task(self._flush(batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def close(self):
+        """Stops accepting writes, flushes everything buffered and waits for every flush to finish."""
+        self._closed = True
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+        while self._requests:
+            await self._flush_slots.acquire()
+            self._start_flush(self._take_batch())
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    def _take_batch(self) -> list:
+        batch, count = [], 0
+        while self._requests and (not batch or count + len(self._requests[0][0]) <= self.max_batch_items):
+            items, future = self._requests.pop(0)
+            batch.append((items, future))
+            count += len(items)
+        self._buffered_items -= count
+        return batch
+
+    async def _flush(self, batch: list):
+        try:
+            try:
+                result = await self.flush_fn([item for items, _ in batch for item in items])
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(result)
+                return
+            except Exception as e:
+                if not self.isolate_failures or len(batch) == 1:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    return
+                logger.warning("Batched flush of %d requests failed, retrying individually: %s", len(batch), e)
+
+            for items, future in batch:
+                try:
+                    result = await self.flush_fn(items)
+                    if not future.done():
+                        future.set_result(result)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+        finally:
+            self._flush_slots.release()